@@ -1,5 +1,6 @@
 from .security_manager import SecurityManager
 from .user_manager import UserManager
 from .data_manager import DataManager
+from .attempt_store import InMemoryAttemptStore, RedisAttemptStore
 
-__all__ = ['SecurityManager', 'UserManager', 'DataManager'] 
\ No newline at end of file
+__all__ = ['SecurityManager', 'UserManager', 'DataManager', 'InMemoryAttemptStore', 'RedisAttemptStore'] 
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Failed login attempt and account lockout tracking.
+InMemoryAttemptStore keeps the state inside the current process, while
+RedisAttemptStore shares it between processes through a Redis client.
+"""
+
+import heapq
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+class InMemoryAttemptStore:
+    """Tracks failed login attempts and lockouts in process memory (time.monotonic() seconds)"""
+
+    def __init__(self, max_attempts: int, lockout_minutes: int):
+        self.max_attempts = max_attempts
+        self.lockout_minutes = lockout_minutes
+        self._window = lockout_minutes * 60.0
+        # {email: deque([timestamp, ...])}; only the newest max_attempts can matter for a lockout
+        self.failed_attempts: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=max_attempts))
+        self.account_lockouts: Dict[str, float] = {}  # {email: lockout_end_time}
+        self._lockout_heap: List[Tuple[float, str]] = []  # [(lockout_end_time, email)]
+        self._lock = threading.Lock()  # logins check and record attempts from several threads
+
+    def check_locked(self, email: str, now: Optional[float] = None) -> Tuple[bool, Optional[float]]:
+        """Check if account is locked out, returning the remaining lockout seconds"""
+        if now is None:
+            now = time.monotonic()
+        with self._lock:
+            return self._check_locked(email, now)
+
+    def _check_locked(self, email: str, now: float) -> Tuple[bool, Optional[float]]:
+        # Clear expired lockouts, soonest first, without rebuilding the dict
+        heap = self._lockout_heap
+        while heap and heap[0][0] <= now:
+            lockout_end, expired_email = heapq.heappop(heap)
+            if self.account_lockouts.get(expired_email) == lockout_end:
+                del self.account_lockouts[expired_email]
+
+        # Check if account is locked
+        if email in self.account_lockouts:
+            return True, self.account_lockouts[email] - now
+
+        # Drop failed attempts that fell out of the window (oldest are on the left)
+        attempts = self.failed_attempts.get(email)
+        if attempts:
+            cutoff = now - self._window
+            while attempts and attempts[0] <= cutoff:
+                attempts.popleft()
+            if not attempts:
+                # Nothing left in the window; drop the entry instead of keeping an empty deque
+                self.failed_attempts.pop(email, None)
+                return False, None
+
+            # Check if too many recent failed attempts
+            if len(attempts) >= self.max_attempts:
+                lockout_end = now + self._window
+                self.account_lockouts[email] = lockout_end
+                heapq.heappush(heap, (lockout_end, email))
+                return True, self._window
+
+        return False, None
+
+    def record_failed(self, email: str, now: Optional[float] = None) -> None:
+        """Record a failed login attempt"""
+        with self._lock:
+            self.failed_attempts[email].append(time.monotonic() if now is None else now)
+
+    def clear(self, email: str) -> None:
+        """Forget failed attempts after a successful login"""
+        with self._lock:
+            self.failed_attempts.pop(email, None)
+
+class RedisAttemptStore:
+    """
+    Tracks failed login attempts and lockouts in Redis so that every
+    worker process shares the same counters. Expiry is handled by Redis TTLs.
+
+    Args:
+        redis: A redis-py compatible client
+        max_attempts: Failed attempts allowed before the account is locked
+        lockout_minutes: Lockout duration and failed-attempt window
+        prefix: Key prefix for all tracking keys
+    """
+
+    def __init__(self, redis, max_attempts: int, lockout_minutes: int, prefix: str = "auth:"):
+        self.redis = redis
+        self.max_attempts = max_attempts
+        self.lockout_seconds = lockout_minutes * 60
+        self.prefix = prefix
+
+    def _fails_key(self, email: str) -> str:
+        return f"{self.prefix}fails:{email}"
+
+    def _lock_key(self, email: str) -> str:
+        return f"{self.prefix}lock:{email}"
+
+    def check_locked(self, email: str, now: Optional[float] = None) -> Tuple[bool, Optional[float]]:
+        """Check if account is locked out, returning the remaining lockout seconds (now is unused; Redis keeps time)"""
+        lock_key = self._lock_key(email)
+        ttl = self.redis.ttl(lock_key)
+        if ttl is not None and ttl > 0:
+            return True, float(ttl)
+
+        fails = self.redis.get(self._fails_key(email))
+        if fails is not None and int(fails) >= self.max_attempts:
+            self.redis.set(lock_key, 1, ex=self.lockout_seconds)
+            return True, float(self.lockout_seconds)
+
+        return False, None
+
+    def record_failed(self, email: str, now: Optional[float] = None) -> None:
+        """Record a failed login attempt"""
+        fails_key = self._fails_key(email)
+        pipe = self.redis.pipeline()
+        pipe.incr(fails_key)
+        pipe.expire(fails_key, self.lockout_seconds)
+        pipe.execute()
+
+    def clear(self, email: str) -> None:
+        """Forget failed attempts after a successful login"""
+        self.redis.delete(self._fails_key(email))
@@ -1,12 +1,23 @@
 import os
 import json
+import bisect
 import pandas as pd
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from datetime import date, datetime
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from openpyxl import load_workbook
 from .security_manager import SecurityManager, FileOperation, FilePermissions
 
+# Every record carries a stable, increasing "_id"; records are kept in _id order
+RECORD_ID = "_id"
+_record_id = itemgetter(RECORD_ID)
+
 class DataManager:
+    # Records appended per step of a bulk import (one progress report each)
+    BULK_CHUNK_SIZE = 5000
+    
     def __init__(self, security_manager: SecurityManager, 
                  schema_file: str = "schema.enc",
                  data_file: str = "database.enc"):
@@ -115,15 +126,46 @@ class DataManager:
         try:
             with open(self.data_file, 'rb') as f:
                 encrypted_data = f.read()
-            return self.security_manager.decrypt_file(encrypted_data, self.master_password)
+            database = self.security_manager.decrypt_file(encrypted_data, self.master_password)
         except FileNotFoundError:
-            return {"data": [], "metadata": {"version": "1.0", "last_updated": None, "updated_by": None, "row_count": 0}}
+            database = {"data": [], "metadata": {"version": "1.0", "last_updated": None, "updated_by": None, "row_count": 0}}
+        self._ensure_record_ids(database)
+        return database
+    
+    @staticmethod
+    def _ensure_record_ids(database: dict) -> None:
+        """Number records from files written before record ids existed (persisted by the next save)"""
+        metadata = database["metadata"]
+        if "next_id" in metadata:
+            return
+        for record_id, record in enumerate(database["data"], 1):
+            record[RECORD_ID] = record_id
+        metadata["next_id"] = len(database["data"]) + 1
+    
+    @staticmethod
+    def _assign_record_ids(database: dict, records: Iterable[Dict]) -> Iterator[Dict]:
+        """Yield copies of records stamped with the next record ids"""
+        metadata = database["metadata"]
+        for record in records:
+            record = dict(record)
+            record[RECORD_ID] = metadata["next_id"]
+            metadata["next_id"] += 1
+            yield record
+    
+    @staticmethod
+    def _write_atomic(path: str, data: bytes) -> None:
+        """Write data to a temporary file and rename it over path, so readers never see a partial file"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
     
     def _save_data(self, database: dict) -> None:
         """Save data to encrypted file"""
         encrypted_data = self.security_manager.encrypt_file(database, self.master_password)
-        with open(self.data_file, 'wb') as f:
-            f.write(encrypted_data)
+        self._write_atomic(self.data_file, encrypted_data)
     
     def update_schema(self, token: str, column_definitions: List[Dict]) -> bool:
         """Update schema with new column definitions (admin only)"""
@@ -154,8 +196,34 @@ class DataManager:
         schema = self._load_schema()
         return schema.get("column_definitions", [])
     
-    def process_excel(self, token: str, file_path: str) -> Tuple[bool, str]:
-        """Process Excel file according to schema"""
+    def _iter_excel_rows(self, file_path: str) -> Iterator[tuple]:
+        """Yield the first worksheet's rows as value tuples (header row first) without loading the whole workbook"""
+        if file_path.lower().endswith(".xls"):
+            # openpyxl cannot read the legacy format; fall back to pandas/xlrd
+            df = pd.read_excel(file_path)
+            yield tuple(df.columns)
+            yield from df.itertuples(index=False, name=None)
+            return
+        
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            yield from workbook[workbook.sheetnames[0]].iter_rows(values_only=True)
+        finally:
+            # Release the zip handle even if the caller stops early
+            workbook.close()
+    
+    @staticmethod
+    def _cell_value(value):
+        """Convert an Excel cell value into something JSON can store"""
+        if value is None or value != value:  # empty cell or NaN
+            return ""
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+    
+    def process_excel(self, token: str, file_path: str,
+                      progress: Optional[Callable[[int], None]] = None) -> Tuple[bool, str]:
+        """Process Excel file according to schema and import its rows (progress receives the running row count)"""
         if not self._can_modify_data(token):
             self._log_db_event("EXCEL_PROCESS_FAILED", "Insufficient permissions", "ERROR")
             return False, "Insufficient permissions"
@@ -173,33 +241,61 @@ class DataManager:
                 self._log_db_event("EXCEL_PROCESS_FAILED", "Schema not defined", "ERROR")
                 return False, "Schema not defined"
             
-            # Read Excel file
-            df = pd.read_excel(file_path)
-            
-            # Validate columns
-            excel_columns = set(df.columns)
-            required_columns = {col_def["excel_column"] for col_def in schema["column_definitions"]}
-            missing_columns = required_columns - excel_columns
-            if missing_columns:
-                error_msg = f"Missing columns in Excel: {missing_columns}"
-                self._log_db_event("EXCEL_VALIDATION_ERROR", error_msg, "ERROR")
-                return False, error_msg
-            
-            self._log_db_event("EXCEL_PROCESSED", f"Excel file processed successfully by {user_email}")
-            return True, "Excel file processed successfully"
+            # Stream the Excel file: validate the header row, then import the rest without materializing it
+            rows = self._iter_excel_rows(file_path)
+            try:
+                header = next(rows, ())
+                
+                # Validate columns
+                positions = {str(column): i for i, column in enumerate(header) if column is not None}
+                required_columns = {col_def["excel_column"] for col_def in schema["column_definitions"]}
+                missing_columns = required_columns - positions.keys()
+                if missing_columns:
+                    error_msg = f"Missing columns in Excel: {missing_columns}"
+                    self._log_db_event("EXCEL_VALIDATION_ERROR", error_msg, "ERROR")
+                    return False, error_msg
+                
+                # Map each non-empty row onto the schema's column names
+                columns = [(col_def["name"], positions[col_def["excel_column"]])
+                           for col_def in schema["column_definitions"]]
+                records = (
+                    {name: self._cell_value(row[i]) if i < len(row) else "" for name, i in columns}
+                    for row in rows if any(value is not None for value in row)
+                )
+                success, message = self.bulk_add_records(token, records, progress=progress)
+            finally:
+                rows.close()
+            
+            if not success:
+                self._log_db_event("EXCEL_PROCESS_FAILED", message, "ERROR")
+                return False, message
+            
+            self._log_db_event("EXCEL_PROCESSED", f"Excel file processed successfully by {user_email}: {message}")
+            return True, f"Excel file processed successfully: {message}"
             
         except Exception as e:
             error_msg = f"Error processing Excel file: {str(e)}"
             self._log_db_event("EXCEL_PROCESS_ERROR", error_msg, "ERROR")
             return False, error_msg
     
-    def get_data(self, page: int = 1, page_size: int = 100) -> Dict:
-        """Get data with pagination (all users)"""
+    def get_data(self, page: int = 1, page_size: int = 100,
+                 after_key: Optional[int] = None, before_key: Optional[int] = None) -> Dict:
+        """
+        Get data with pagination (all users).
+        With after_key/before_key the page is the page_size records following/preceding that
+        record id (keyset paging), so inserts and deletes elsewhere do not shift it; otherwise
+        page selects by offset.
+        """
         database = self._load_data()
         data = database["data"]
         
-        # Calculate pagination
-        start_idx = (page - 1) * page_size
+        # Calculate pagination; records are in _id order, so a key is found by binary search
+        if after_key is not None:
+            start_idx = bisect.bisect_right(data, after_key, key=_record_id)
+        elif before_key is not None:
+            start_idx = max(bisect.bisect_left(data, before_key, key=_record_id) - page_size, 0)
+        else:
+            start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
         
         return {
@@ -208,13 +304,22 @@ class DataManager:
             "pagination": {
                 "total_records": len(data),
                 "total_pages": (len(data) + page_size - 1) // page_size,
-                "current_page": page,
-                "page_size": page_size
+                "current_page": start_idx // page_size + 1,
+                "page_size": page_size,
+                "start_index": start_idx
             }
         }
     
-    def update_record(self, token: str, record_index: int, updated_data: Dict) -> Tuple[bool, str]:
-        """Update a specific record in the database"""
+    @staticmethod
+    def _find_record(data: List[Dict], record_id: int) -> int:
+        """Return the list index of the record with record_id, or -1 (binary search over _id order)"""
+        index = bisect.bisect_left(data, record_id, key=_record_id)
+        if index < len(data) and data[index][RECORD_ID] == record_id:
+            return index
+        return -1
+    
+    def update_record(self, token: str, record_id: int, updated_data: Dict) -> Tuple[bool, str]:
+        """Update the record with the given record id"""
         if not self._can_modify_data(token):
             self._log_db_event("RECORD_UPDATE_FAILED", "Insufficient permissions", "ERROR")
             return False, "Insufficient permissions"
@@ -225,13 +330,15 @@ class DataManager:
             user_email = token_data["email"]
             
             database = self._load_data()
-            if record_index < 0 or record_index >= len(database["data"]):
-                self._log_db_event("RECORD_UPDATE_FAILED", f"Invalid record index: {record_index}", "ERROR")
-                return False, "Invalid record index"
+            record_index = self._find_record(database["data"], record_id)
+            if record_index < 0:
+                self._log_db_event("RECORD_UPDATE_FAILED", f"Record not found: {record_id}", "ERROR")
+                return False, "Record not found"
             
-            # Update record
-            old_data = database["data"][record_index].copy()
-            database["data"][record_index].update(updated_data)
+            # Update record (the id itself is not editable)
+            record = database["data"][record_index]
+            record.update(updated_data)
+            record[RECORD_ID] = record_id
             
             # Update metadata
             database["metadata"]["last_updated"] = datetime.utcnow().isoformat()
@@ -241,7 +348,7 @@ class DataManager:
             
             self._log_db_event(
                 "RECORD_UPDATED", 
-                f"Record #{record_index} updated by {user_email}. Changes: {updated_data}"
+                f"Record #{record_id} updated by {user_email}. Changes: {updated_data}"
             )
             return True, "Record updated successfully"
             
@@ -270,7 +377,7 @@ class DataManager:
             database = self._load_data()
             
             # Add new record
-            database["data"].append(record_data)
+            database["data"].extend(self._assign_record_ids(database, (record_data,)))
             
             # Update metadata
             database["metadata"]["last_updated"] = datetime.utcnow().isoformat()
@@ -283,8 +390,51 @@ class DataManager:
         except Exception as e:
             return False, f"Error adding record: {str(e)}"
     
-    def delete_record(self, token: str, record_index: int) -> Tuple[bool, str]:
-        """Delete a record from the database"""
+    def bulk_add_records(self, token: str, records: Iterable[Dict],
+                         progress: Optional[Callable[[int], None]] = None) -> Tuple[bool, str]:
+        """Add many records with one load and one save of the database (admin/moderator only)"""
+        if not self._can_modify_data(token):
+            self._log_db_event("BULK_ADD_FAILED", "Insufficient permissions", "ERROR")
+            return False, "Insufficient permissions"
+            
+        try:
+            # Get user email from token
+            token_data = self.security_manager.verify_session_token(token)
+            user_email = token_data["email"]
+            
+            database = self._load_data()
+            data = database["data"]
+            initial_count = len(data)
+            
+            # Append chunk by chunk straight from the iterator, reporting progress per chunk
+            records = iter(records)
+            while True:
+                chunk_start = len(data)
+                data.extend(self._assign_record_ids(database, islice(records, self.BULK_CHUNK_SIZE)))
+                if len(data) == chunk_start:
+                    break
+                if progress is not None:
+                    progress(len(data) - initial_count)
+            added = len(data) - initial_count
+            
+            # Update metadata
+            database["metadata"]["last_updated"] = datetime.utcnow().isoformat()
+            database["metadata"]["updated_by"] = user_email
+            database["metadata"]["row_count"] = len(data)
+            
+            # The database is a single encrypted document, so it is written once at the end
+            self._save_data(database)
+            
+            self._log_db_event("RECORDS_ADDED", f"{added} records added by {user_email}")
+            return True, f"{added} records added"
+            
+        except Exception as e:
+            error_msg = f"Error adding records: {str(e)}"
+            self._log_db_event("BULK_ADD_ERROR", error_msg, "ERROR")
+            return False, error_msg
+    
+    def delete_record(self, token: str, record_id: int) -> Tuple[bool, str]:
+        """Delete the record with the given record id"""
         if not self._can_delete_data(token):
             self._log_db_event("RECORD_DELETE_FAILED", "Insufficient permissions for deletion", "ERROR")
             return False, "Insufficient permissions for deletion"
@@ -295,9 +445,10 @@ class DataManager:
             user_email = token_data["email"]
             
             database = self._load_data()
-            if record_index < 0 or record_index >= len(database["data"]):
-                self._log_db_event("RECORD_DELETE_FAILED", f"Invalid record index: {record_index}", "ERROR")
-                return False, "Invalid record index"
+            record_index = self._find_record(database["data"], record_id)
+            if record_index < 0:
+                self._log_db_event("RECORD_DELETE_FAILED", f"Record not found: {record_id}", "ERROR")
+                return False, "Record not found"
             
             # Store record for logging
             deleted_record = database["data"][record_index]
@@ -314,7 +465,7 @@ class DataManager:
             
             self._log_db_event(
                 "RECORD_DELETED", 
-                f"Record #{record_index} deleted by {user_email}. Record data: {deleted_record}"
+                f"Record #{record_id} deleted by {user_email}. Record data: {deleted_record}"
             )
             return True, "Record deleted successfully"
             
@@ -1,10 +1,14 @@
 import os
 import json
+import binascii
+import functools
 import bcrypt
 import re
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 import logging
 from datetime import datetime, timedelta, UTC
-from typing import Dict, Optional, Tuple, List
+from typing import Callable, Dict, Optional, Tuple, List
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -92,7 +96,16 @@ class FilePermissions:
         "user": []
     }
 
+    # (admin_role, target_role) pairs allowed by the hierarchy, for single-lookup checks
+    MANAGEABLE_ROLE_PAIRS = frozenset(
+        (admin_role, target_role)
+        for admin_role, target_roles in ROLE_HIERARCHY.items()
+        for target_role in target_roles
+    )
+
+    # Roles and operations are fixed, so permission answers are memoized
     @classmethod
+    @functools.lru_cache(maxsize=None)
     def has_permission(cls, role: str, operation: FileOperation) -> bool:
         """Check if role has permission for operation"""
         if role not in cls.ROLE_PERMISSIONS:
@@ -111,17 +124,10 @@ class FilePermissions:
                 if perms.get(operation, False)]
 
     @classmethod
+    @functools.lru_cache(maxsize=None)
     def can_manage_role(cls, admin_role: str, target_role: str) -> bool:
-        """Check if admin_role can manage users with target_role"""
-        # Root can manage all roles except other roots
-        if admin_role == "root":
-            return target_role != "root"
-            
-        # Check role hierarchy
-        if admin_role in cls.ROLE_HIERARCHY:
-            return target_role in cls.ROLE_HIERARCHY[admin_role]
-            
-        return False
+        """Check if admin_role can manage users with target_role (root never manages root)"""
+        return (admin_role, target_role) in cls.MANAGEABLE_ROLE_PAIRS
 
     @classmethod
     def get_manageable_roles(cls, admin_role: str) -> List[str]:
@@ -129,13 +135,20 @@ class FilePermissions:
         return cls.ROLE_HIERARCHY.get(admin_role, [])
 
 class SecurityManager:
+    # Upper bound on cached PBKDF2 keys (one per distinct password in use)
+    MAX_CACHED_KEYS = 8
+    
     def __init__(self, salt_file: str = "salt.key"):
         """Initialize SecurityManager with a salt file for key derivation"""
         self.salt_file = salt_file
+        # argon2-cffi always runs the native C implementation
+        self._password_hasher = PasswordHasher()
         self._setup_logging()
         self._ensure_salt()
         # Load and store salt at initialization
         self._salt = self._load_salt()
+        # Derived keys are deterministic for a fixed salt, so derive once per password
+        self._derived_keys: Dict[str, bytes] = {}
         
     def _setup_logging(self) -> None:
         """Setup security event logging using centralized logging configuration"""
@@ -193,21 +206,25 @@ class SecurityManager:
             return salt
     
     def _derive_key(self, password: str) -> bytes:
-        """Derive encryption key from password using PBKDF2"""
+        """Derive encryption key from password using PBKDF2 (cached per password)"""
+        key = self._derived_keys.get(password)
+        if key is not None:
+            return key
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
             salt=self._salt,  # Use stored salt
             iterations=100000,
         )
-        return kdf.derive(password.encode())
+        key = kdf.derive(password.encode())
+        if len(self._derived_keys) >= self.MAX_CACHED_KEYS:
+            self._derived_keys.clear()
+        self._derived_keys[password] = key
+        return key
     
-    def encrypt_file(self, data: dict, password: str) -> bytes:
-        """Encrypt data with password"""
+    def encrypt_bytes(self, payload: bytes, password: str) -> bytes:
+        """Encrypt raw bytes with password"""
         try:
-            # Convert data to JSON string
-            json_data = json.dumps(data).encode()
-            
             # Derive key and create AESGCM instance
             key = self._derive_key(password)
             aesgcm = AESGCM(key)
@@ -216,7 +233,7 @@ class SecurityManager:
             nonce = os.urandom(12)
             
             # Encrypt data
-            encrypted_data = aesgcm.encrypt(nonce, json_data, None)
+            encrypted_data = aesgcm.encrypt(nonce, payload, None)
             
             # Combine nonce and encrypted data
             self._log_security_event("ENCRYPTION", "File encryption successful")
@@ -225,15 +242,16 @@ class SecurityManager:
             self._log_security_event("ENCRYPTION_ERROR", str(e), "ERROR")
             raise ValueError(f"Encryption failed: {str(e)}")
     
-    def decrypt_file(self, encrypted_data: bytes, password: str) -> dict:
-        """Decrypt data with password"""
+    def decrypt_bytes(self, encrypted_data, password: str) -> bytes:
+        """Decrypt raw bytes with password (encrypted_data may be any bytes-like object, e.g. an mmap)"""
         try:
-            # Decode from base64
-            raw_data = b64decode(encrypted_data)
+            # Decode from base64 straight out of the caller's buffer
+            raw_data = binascii.a2b_base64(encrypted_data)
             
-            # Extract nonce and ciphertext
-            nonce = raw_data[:12]
-            ciphertext = raw_data[12:]
+            # Extract nonce and ciphertext without copying
+            view = memoryview(raw_data)
+            nonce = view[:12]
+            ciphertext = view[12:]
             
             # Derive key and create AESGCM instance
             key = self._derive_key(password)
@@ -241,22 +259,61 @@ class SecurityManager:
             
             # Decrypt data
             decrypted_data = aesgcm.decrypt(nonce, ciphertext, None)
-            
-            # Parse JSON
             self._log_security_event("DECRYPTION", "File decryption successful")
-            return json.loads(decrypted_data.decode())
+            return decrypted_data
+        except Exception as e:
+            self._log_security_event("DECRYPTION_ERROR", str(e), "ERROR")
+            raise ValueError(f"Decryption failed. Invalid password or corrupted data: {str(e)}")
+    
+    def encrypt_file(self, data: dict, password: str,
+                     serializer: Optional[Callable[[dict], bytes]] = None) -> bytes:
+        """Encrypt data with password (serializer defaults to compact json.dumps)"""
+        try:
+            # Convert data to JSON bytes; whitespace is pointless inside ciphertext
+            if serializer:
+                json_data = serializer(data)
+            else:
+                json_data = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+        except Exception as e:
+            self._log_security_event("ENCRYPTION_ERROR", str(e), "ERROR")
+            raise ValueError(f"Encryption failed: {str(e)}")
+        return self.encrypt_bytes(json_data, password)
+    
+    def decrypt_file(self, encrypted_data, password: str,
+                     deserializer: Optional[Callable[[bytes], dict]] = None) -> dict:
+        """Decrypt data with password (deserializer defaults to json.loads)"""
+        decrypted_data = self.decrypt_bytes(encrypted_data, password)
+        try:
+            # Parse JSON
+            if deserializer:
+                return deserializer(decrypted_data)
+            return json.loads(decrypted_data)
         except Exception as e:
             self._log_security_event("DECRYPTION_ERROR", str(e), "ERROR")
             raise ValueError(f"Decryption failed. Invalid password or corrupted data: {str(e)}")
     
     def hash_password(self, password: str) -> bytes:
-        """Hash password using bcrypt"""
-        return bcrypt.hashpw(password.encode(), bcrypt.gensalt())
+        """Hash password using Argon2id"""
+        return self._password_hasher.hash(password).encode()
     
     def verify_password(self, password: str, hashed: bytes) -> bool:
-        """Verify password against hash"""
+        """Verify password against hash (Argon2id, or bcrypt for older accounts)"""
+        if hashed.startswith(b"$argon2"):
+            try:
+                return self._password_hasher.verify(hashed, password)
+            except (VerificationError, InvalidHashError):
+                return False
         return bcrypt.checkpw(password.encode(), hashed)
     
+    def needs_rehash(self, hashed: bytes) -> bool:
+        """Check if hash is bcrypt or uses other Argon2 parameters than the current hasher"""
+        if not hashed.startswith(b"$argon2"):
+            return True
+        try:
+            return self._password_hasher.check_needs_rehash(hashed)
+        except InvalidHashError:
+            return True
+    
     def create_session_token(self, user_data: dict) -> Tuple[str, datetime]:
         """Create a session token for user"""
         # Create token with timestamp and user data
@@ -1,202 +1,712 @@
 import os
 import json
+import mmap
+import asyncio
+import atexit
+import functools
+import threading
+import hmac
+import secrets
+import sys
+import time
 import logging
-from datetime import datetime, timedelta, UTC
+import operator
+from datetime import datetime, UTC
 from typing import Dict, Optional, List, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from core.security_manager import SecurityManager, FileOperation, FilePermissions
+from core.attempt_store import InMemoryAttemptStore
 from dotenv import load_dotenv
 
+def _bytes_to_str(value):
+    """JSON fallback for password hashes, which are kept as bytes in memory"""
+    if isinstance(value, bytes):
+        return value.decode()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+try:
+    # Optional C JSON codec; its output is plain JSON, so files stay interchangeable
+    import orjson
+    
+    def _json_dumps(data: dict) -> bytes:
+        return orjson.dumps(data, default=_bytes_to_str)
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(data: dict) -> bytes:
+        return json.dumps(data, default=_bytes_to_str, separators=(",", ":"), ensure_ascii=False).encode()
+    _json_loads = json.loads
+
+# .env is parsed by the first UserManager only; later instances reuse os.environ
+_DOTENV_LOADED = False
+
+def _ensure_env() -> None:
+    """Load .env into os.environ once per process"""
+    global _DOTENV_LOADED
+    if not _DOTENV_LOADED:
+        load_dotenv()
+        _DOTENV_LOADED = True
+
+@functools.lru_cache(maxsize=None)
+def _env(name: str) -> Optional[str]:
+    """Process-constant environment lookup (call _ensure_env first)"""
+    return os.getenv(name)
+
+# Pool for hashing many passwords at once (bulk user creation). Argon2 and bcrypt
+# release the GIL while hashing, so threads spread the hashes across all cores.
+_HASH_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="password-hash")
+
+# Fields exposed by get_users, fetched in one call per user
+_USER_FIELDS = operator.itemgetter("role", "created_at", "last_login")
+
+class _RWLock:
+    """Lets many readers or one writer in; the writing thread may re-enter either side"""
+    
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer: Optional[int] = None
+        self._writer_depth = 0
+        self._writers_waiting = 0
+    
+    def acquire_read(self) -> None:
+        with self._cond:
+            if self._writer == threading.get_ident():
+                self._writer_depth += 1
+                return
+            # Waiting writers go first so a steady stream of logins cannot starve them
+            while self._writer is not None or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+    
+    def release_read(self) -> None:
+        with self._cond:
+            if self._writer == threading.get_ident():
+                self._writer_depth -= 1
+                return
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+    
+    def acquire_write(self) -> None:
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                return
+            self._writers_waiting += 1
+            while self._writer is not None or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = me
+            self._writer_depth = 1
+    
+    def release_write(self) -> None:
+        with self._cond:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._cond.notify_all()
+
+def _reads_users(method):
+    """Run method under the users cache read lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._users_lock.acquire_read()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._users_lock.release_read()
+    return wrapper
+
+def _writes_users(method):
+    """Run method under the users cache write lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._users_lock.acquire_write()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._users_lock.release_write()
+    return wrapper
+
 class UserManager:
-    VALID_ROLES = list(FilePermissions.ROLE_PERMISSIONS.keys())
+    VALID_ROLES = frozenset(FilePermissions.ROLE_PERMISSIONS)
     MAX_LOGIN_ATTEMPTS = 5
     LOCKOUT_DURATION = 15  # minutes
+    LOCKOUT_SECONDS = LOCKOUT_DURATION * 60.0
+    VERIFY_CACHE_SIZE = 1024  # entries
+    TOKEN_CACHE_SIZE = 256  # verified session tokens
+    LAST_LOGIN_FLUSH_DELAY = 2.0  # seconds
+    POPULARITY_THRESHOLD = 50  # weighted failed attempts before the account is locked
+    POPULARITY_TABLE_SIZE = 10000  # tracked password digests
+    FAILED_LOGIN_MIN_INTERVAL = 1.0  # seconds before an email may retry after a failure
+    JOURNAL_COMPACT_RECORDS = 500  # journal records before the snapshot is rewritten
+    JOURNAL_COMPACT_BYTES = 1024 * 1024  # journal size before the snapshot is rewritten
+    _created_dirs: set = set()  # directories already ensured by any instance in this process
     
-    def __init__(self, security_manager: SecurityManager, users_file: Optional[str] = None):
-        """Initialize UserManager with SecurityManager instance"""
+    def __init__(self, security_manager: SecurityManager, users_file: Optional[str] = None,
+                 attempt_store=None):
+        """
+        Initialize UserManager with SecurityManager instance.
+        attempt_store defaults to per-process tracking; pass a RedisAttemptStore
+        to share failed attempts and lockouts between worker processes.
+        """
         # Load environment variables
-        load_dotenv()
+        _ensure_env()
         
         self.security_manager = security_manager
         
+        # Hot permission and password checks, bound once
+        self._has_perm = FilePermissions.has_permission
+        self._can_manage = FilePermissions.can_manage_role
+        self._verify_pw = security_manager.verify_password
+        self._hash_pw = security_manager.hash_password
+        
         # Get required environment variables
         self.users_file = users_file or self._get_required_env("USERS_FILE")
         self.master_password = self._get_required_env("MASTER_PASSWORD")
         
+        # Append-only journal of encrypted per-user changes replayed over the users file snapshot
+        self.users_log_file = self.users_file + ".log"
+        self._journal_records = 0
+        
         # Failed login attempts tracking
-        self.failed_attempts = {}  # {email: [timestamp, ...]}
-        self.account_lockouts = {}  # {email: lockout_end_time}
+        self._attempt_store = attempt_store or InMemoryAttemptStore(
+            self.MAX_LOGIN_ATTEMPTS, self.LOCKOUT_DURATION
+        )
+        
+        # Opt-in reuse of recent password check outcomes (VERIFY_CACHE_TTL seconds, 0 = off)
+        self._verify_cache_ttl = float(_env("VERIFY_CACHE_TTL") or "0")
+        self._verify_key = os.urandom(32)  # Per-process secret for password-derived keys
+        # {(email, password_digest): (result, checked_at, password_hash)}
+        self._verify_cache: "OrderedDict[Tuple[str, bytes], Tuple[bool, float, bytes]]" = OrderedDict()
+        
+        # Recently verified session tokens: {token: (token_data, expires_at_timestamp)}
+        self._token_cache: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        
+        # DALock-style popularity tracking: failed guesses are weighted by how often
+        # the same password has failed across all accounts in this process; both decay
+        # once LOCKOUT_SECONDS pass without a new failure. Both tables are kept in
+        # last-failure order and pruned from the old end (see _put_failure)
+        self._password_popularity: "OrderedDict[bytes, Tuple[int, float]]" = OrderedDict()  # {password_digest: (failures, last_failure)}
+        self._hit_counts: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()  # {email: (hits, last_failure)}
+        self._last_failure: "OrderedDict[str, float]" = OrderedDict()  # {email: monotonic time of last failed login}
+        
+        # Hash checked for unknown emails so they cost as much as a wrong password;
+        # made up front so the first unknown email does not also pay for hashing
+        self._dummy_hash: bytes = self._hash_pw(secrets.token_urlsafe(32))
+        
+        # Readers (logins, listings) share the cache; mutations and flushes are exclusive
+        self._users_lock = _RWLock()
+        self._refresh_lock = threading.Lock()  # held while _load_users rebuilds the cache
+        # Concurrent readers still update the LRU caches and failed-login bookkeeping above;
+        # those short sections run under this mutex (never held across hashing or file work)
+        self._state_lock = threading.RLock()
+        
+        # Decrypted users data, valid while the users file and journal stat signatures are unchanged
+        self._users_cache: Optional[dict] = None
+        self._users_cache_sig: Optional[Tuple[int, int, int, int]] = None
+        self._email_index: Dict[str, str] = {}  # {casefolded email: stored email}
+        self._role_caps: Dict[str, Tuple[bool, frozenset]] = {}  # see _role_capabilities
+        
+        # last_login updates are applied to the cache and journaled by a deferred flush
+        self._pending_logins: Dict[str, str] = {}  # {email: last_login}
+        self._pending_rehash: set = set()  # emails whose password hash was upgraded at login
+        self._flush_lock = threading.RLock()
+        self._flush_timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
         
         # Setup logging
         self._setup_logging()
         
         # Ensure data directory exists
-        os.makedirs(os.path.dirname(self.users_file), exist_ok=True)
+        self._ensure_dir(os.path.dirname(self.users_file))
         
         self._ensure_root()
     
+    @classmethod
+    def _ensure_dir(cls, path: str) -> None:
+        """Create path once per process"""
+        if path not in cls._created_dirs:
+            os.makedirs(path, exist_ok=True)
+            cls._created_dirs.add(path)
+    
     def _setup_logging(self) -> None:
         """Setup user operations logging"""
         log_dir = "logs"
-        os.makedirs(log_dir, exist_ok=True)
+        self._ensure_dir(log_dir)
         
         # Configure logging
         self.logger = logging.getLogger('user_manager')
         self.logger.setLevel(logging.INFO)
         
-        # Create file handler
-        handler = logging.FileHandler(os.path.join(log_dir, "user_operations.log"))
-        handler.setLevel(logging.INFO)
-        
-        # Create formatter
-        formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        handler.setFormatter(formatter)
+        # The logger is process-wide; only the first instance attaches the file handler
+        if not self.logger.handlers:
+            # Create file handler
+            handler = logging.FileHandler(os.path.join(log_dir, "user_operations.log"))
+            handler.setLevel(logging.INFO)
+            
+            # Create formatter
+            formatter = logging.Formatter(
+                '%(asctime)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+            handler.setFormatter(formatter)
+            
+            # Add handler to logger
+            self.logger.addHandler(handler)
         
-        # Add handler to logger
-        self.logger.addHandler(handler)
+        # {level name: (level number, bound log method)}
+        self._log_methods = {
+            name: (logging.getLevelName(name), getattr(self.logger, name.lower()))
+            for name in ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+        }
     
     def _log_user_event(self, event_type: str, details: str, level: str = "INFO") -> None:
         """Log user management event"""
-        log_method = getattr(self.logger, level.lower())
-        log_method(f"{event_type}: {details}")
+        level_no, log_method = self._log_methods[level]
+        if self.logger.isEnabledFor(level_no):
+            log_method("%s: %s", event_type, details)
     
     def _get_required_env(self, var_name: str) -> str:
         """Get required environment variable or raise error"""
-        value = os.getenv(var_name)
+        value = _env(var_name)
         if value is None:
             raise ValueError(f"Required environment variable {var_name} is not set. Please check your .env file.")
         return value
     
+    def _hash_root_password(self, root_password: str) -> str:
+        """
+        Hash the root password for a new users file.
+        With DBPROJECT_FAST_BOOTSTRAP set (development/CI only), the hash is reused
+        from ~/.cache/dbproject so repeated bootstraps skip the slow hash.
+        """
+        if not _env("DBPROJECT_FAST_BOOTSTRAP"):
+            return self.security_manager.hash_password(root_password).decode()
+        
+        key = hmac.new(b"bootstrap", root_password.encode(), "sha256").hexdigest()
+        cache_path = os.path.join(os.path.expanduser("~"), ".cache", "dbproject", f"root_hash_{key}")
+        try:
+            with open(cache_path, 'r') as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        
+        root_hash = self.security_manager.hash_password(root_password).decode()
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(os.open(cache_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as f:
+            f.write(root_hash)
+        return root_hash
+    
     def _ensure_root(self) -> None:
         """Ensure root user exists"""
+        # An existing users file means setup already ran; an empty one is left over
+        # from an interrupted bootstrap and is replaced
         try:
-            if not os.path.exists(self.users_file):
-                # Get required root credentials from environment
-                root_email = self._get_required_env("ROOT_EMAIL")
-                root_password = self._get_required_env("ROOT_PASSWORD")
-                
-                # Create root user
-                root_data = {
-                    "users": {
-                        root_email: {
-                            "password_hash": self.security_manager.hash_password(root_password).decode(),
-                            "role": "root",
-                            "created_at": datetime.now(UTC).isoformat(),
-                            "last_login": None,
-                            "is_root": True
-                        }
+            if os.path.getsize(self.users_file):
+                return
+            os.remove(self.users_file)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            raise ValueError(f"Failed to create root account: {str(e)}")
+        
+        tmp_path = f"{self.users_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # Get required root credentials from environment
+            root_email = self._get_required_env("ROOT_EMAIL")
+            root_password = self._get_required_env("ROOT_PASSWORD")
+            
+            # Create root user
+            root_data = {
+                "users": {
+                    root_email: {
+                        "password_hash": self._hash_root_password(root_password),
+                        "role": "root",
+                        "created_at": datetime.now(UTC).isoformat(),
+                        "last_login": None,
+                        "is_root": True
                     }
                 }
-                
-                # Encrypt and save
-                encrypted_data = self.security_manager.encrypt_file(root_data, self.master_password)
-                with open(self.users_file, 'wb') as f:
-                    f.write(encrypted_data)
-                
-                # Verify the data was written correctly
-                with open(self.users_file, 'rb') as f:
-                    test_data = f.read()
-                decrypted_data = self.security_manager.decrypt_file(test_data, self.master_password)
-                if decrypted_data != root_data:
-                    raise ValueError("Root data verification failed")
-                    
+            }
+            
+            # Encrypt and write the complete file first; AES-GCM authenticates it on every later load
+            encrypted_data = self.security_manager.encrypt_file(root_data, self.master_password, _json_dumps)
+            with open(tmp_path, 'wb') as f:
+                f.write(encrypted_data)
+                f.flush()
+                os.fsync(f.fileno())
+            
+            # Claim the users file atomically; if another process got there first, its root account stands
+            try:
+                os.link(tmp_path, self.users_file)
+            except FileExistsError:
+                pass
         except Exception as e:
             raise ValueError(f"Failed to create root account: {str(e)}")
+        finally:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+    
+    def _file_signature(self, st: Optional[os.stat_result] = None) -> Tuple[int, int, int, int]:
+        """
+        Return (mtime_ns, size) of the users file followed by those of the journal.
+        st may carry an already known stat of the users file.
+        """
+        if st is None:
+            st = os.stat(self.users_file)
+        try:
+            log_st = os.stat(self.users_log_file)
+        except FileNotFoundError:
+            return st.st_mtime_ns, st.st_size, 0, 0
+        return st.st_mtime_ns, st.st_size, log_st.st_mtime_ns, log_st.st_size
+    
+    def _replay_journal(self, users_data: dict) -> int:
+        """
+        Apply journal records to users_data and return the number of records.
+        A final record that cannot be decrypted was torn by a crash mid-append;
+        it is cut off the journal instead of failing every later load.
+        """
+        try:
+            with open(self.users_log_file, 'rb') as f:
+                lines = f.read().splitlines(keepends=True)
+        except FileNotFoundError:
+            return 0
+        
+        users = users_data["users"]
+        offset = 0
+        for index, line in enumerate(lines):
+            try:
+                record = self.security_manager.decrypt_file(line.rstrip(b"\n"), self.master_password, _json_loads)
+            except ValueError:
+                if index < len(lines) - 1:
+                    raise
+                self._log_user_event("JOURNAL_TRUNCATED", f"Dropped a torn record at byte {offset}", "WARNING")
+                with open(self.users_log_file, 'r+b') as f:
+                    f.truncate(offset)
+                    os.fsync(f.fileno())
+                return index
+            offset += len(line)
+            op, email = record["op"], record["email"]
+            if op == "put":
+                users[email] = record["user"]
+            elif op == "del":
+                users.pop(email, None)
+            elif op == "last_login" and email in users:
+                users[email]["last_login"] = record["ts"]
+        return len(lines)
+    
+    def _append_journal(self, records: List[dict]) -> None:
+        """Encrypt records and append them to the journal"""
+        lines = b"".join(
+            self.security_manager.encrypt_file(record, self.master_password, _json_dumps) + b"\n"
+            for record in records
+        )
+        with open(self.users_log_file, 'ab') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_records += len(records)
+    
+    def _commit_journal(self, records: List[dict]) -> None:
+        """
+        Append records for changes already applied to the cached users data.
+        The journal is folded into the snapshot once it passes the compaction limits.
+        """
+        try:
+            # Appending never overwrites other writers; if the files changed since
+            # our last load, the cache is dropped and the next load replays both
+            cache_current = self._file_signature() == self._users_cache_sig
+            self._append_journal(records)
+        except Exception:
+            self._users_cache = None
+            raise
+        if not cache_current:
+            self._users_cache = None
+            return
+        
+        self._users_cache_sig = self._file_signature()
+        if (self._journal_records >= self.JOURNAL_COMPACT_RECORDS or
+                self._users_cache_sig[3] >= self.JOURNAL_COMPACT_BYTES):
+            self._save_users(self._users_cache)
+    
+    def _journal_put(self, users_data: dict, *emails: str) -> None:
+        """Persist the current state of the given users"""
+        users = users_data["users"]
+        self._commit_journal([{"op": "put", "email": email, "user": users[email]} for email in emails])
+    
+    def _journal_delete(self, email: str) -> None:
+        """Persist the removal of a user"""
+        self._commit_journal([{"op": "del", "email": email}])
     
     def _load_users(self) -> dict:
-        """Load users data from encrypted file"""
+        """
+        Load users data from encrypted file.
+        The decrypted data is cached until the file changes on disk; the returned
+        dict is the cache itself, so callers that mutate it must persist the change
+        through _journal_put/_journal_delete.
+        """
         try:
-            if not os.path.exists(self.users_file):
+            try:
+                signature = self._file_signature()
+            except FileNotFoundError:
                 return {"users": {}}
-                
-            with open(self.users_file, 'rb') as f:
-                encrypted_data = f.read()
-            return self.security_manager.decrypt_file(encrypted_data, self.master_password)
+            
+            if self._users_cache is not None and signature == self._users_cache_sig:
+                return self._users_cache
+            
+            # Readers share the users lock, so only one of them rebuilds the cache
+            with self._refresh_lock:
+                if self._users_cache is not None and signature == self._users_cache_sig:
+                    return self._users_cache
+                    
+                # Decrypt straight from the page cache instead of copying the file into bytes first
+                with open(self.users_file, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as encrypted_data:
+                    users_data = self.security_manager.decrypt_file(encrypted_data, self.master_password, _json_loads)
+                self._journal_records = self._replay_journal(users_data)
+                # Password hashes are persisted as str but used as bytes
+                for user in users_data["users"].values():
+                    user["password_hash"] = user["password_hash"].encode()
+                # Publish the index and data before the signature that marks them current
+                self._email_index = {email.casefold(): email for email in users_data["users"]}
+                self._users_cache = users_data
+                self._users_cache_sig = signature
+                return users_data
         except Exception as e:
             raise ValueError(f"Failed to load users data: {str(e)}")
     
+    def _find_email(self, users_data: dict, email: str) -> Optional[str]:
+        """Return the stored spelling of email, matching case-insensitively"""
+        users = users_data["users"]
+        if email in users:
+            return email
+        stored = self._email_index.get(email.casefold())
+        return stored if stored in users else None
+    
+    def _write_atomic(self, path: str, data: bytes) -> os.stat_result:
+        """Write data to a temporary file, rename it over path and return its stat"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+            st = os.fstat(f.fileno())
+        os.replace(tmp_path, path)
+        return st
+    
     def _save_users(self, users_data: dict) -> None:
-        """Save users data to encrypted file"""
-        encrypted_data = self.security_manager.encrypt_file(users_data, self.master_password)
-        with open(self.users_file, 'wb') as f:
-            f.write(encrypted_data)
+        """Save users data to encrypted file, folding in and truncating the journal"""
+        try:
+            encrypted_data = self.security_manager.encrypt_file(users_data, self.master_password, _json_dumps)
+            snapshot_st = self._write_atomic(self.users_file, encrypted_data)
+            # The snapshot now holds everything the journal recorded
+            if self._journal_records:
+                with open(self.users_log_file, 'wb') as f:
+                    os.fsync(f.fileno())
+                self._journal_records = 0
+        except Exception:
+            # The cached dict may hold unsaved changes - reload from disk next time
+            self._users_cache = None
+            raise
+        self._users_cache = users_data
+        # The rename keeps the temp file's mtime and size, so its fstat is the new signature
+        self._users_cache_sig = self._file_signature(snapshot_st)
+        # Pending last_login updates were part of users_data, so the deferred flush has nothing left
+        with self._flush_lock:
+            self._pending_logins.clear()
+            self._pending_rehash.clear()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
     
-    def _check_account_lockout(self, email: str) -> Tuple[bool, Optional[datetime]]:
-        """Check if account is locked out"""
-        now = datetime.now(UTC)
-        
-        # Clear old lockouts
-        self.account_lockouts = {
-            e: t for e, t in self.account_lockouts.items()
-            if t > now
-        }
+    @_writes_users
+    def compact(self) -> None:
+        """Rewrite the users file snapshot and truncate the journal"""
+        self._save_users(self._load_users())
+    
+    def _schedule_flush(self, email: str, last_login: str, rehashed: bool = False) -> None:
+        """Queue a last_login update (and upgraded password hash) and make sure a deferred flush is pending"""
+        with self._flush_lock:
+            self._pending_logins[email] = last_login
+            if rehashed:
+                self._pending_rehash.add(email)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.LAST_LOGIN_FLUSH_DELAY, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    @_writes_users
+    def flush(self) -> None:
+        """Append pending last_login updates and upgraded password hashes to the journal"""
+        with self._flush_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._pending_logins:
+                return
+            records = [
+                {"op": "last_login", "email": email, "ts": ts}
+                for email, ts in self._pending_logins.items()
+            ]
+            users = self._users_cache["users"] if self._users_cache is not None else {}
+            records.extend(
+                {"op": "put", "email": email, "user": users[email]}
+                for email in self._pending_rehash if email in users
+            )
+            self._pending_logins.clear()
+            self._pending_rehash.clear()
+            try:
+                self._commit_journal(records)
+            except Exception as e:
+                self._log_user_event("LAST_LOGIN_FLUSH_ERROR", str(e), "ERROR")
+    
+    def _verify_password_cached(self, email: str, password: str, password_hash: bytes,
+                                password_digest: bytes) -> bool:
+        """Verify password, reusing a recent verification outcome when enabled"""
+        if self._verify_cache_ttl <= 0:
+            return self._verify_pw(password, password_hash)
         
-        # Check if account is locked
-        if email in self.account_lockouts:
-            return True, self.account_lockouts[email]
+        # password_digest is keyed with a per-process secret, so cached keys are
+        # useless outside this process; entries also stop matching once the hash changes
+        key = (email, password_digest)
+        now = time.monotonic()
+        with self._state_lock:
+            entry = self._verify_cache.get(key)
+            if entry is not None:
+                result, checked_at, cached_hash = entry
+                if now - checked_at < self._verify_cache_ttl and cached_hash == password_hash:
+                    self._verify_cache.move_to_end(key)
+                    return result
+                self._verify_cache.pop(key, None)
         
-        # Clear old failed attempts
-        if email in self.failed_attempts:
-            self.failed_attempts[email] = [
-                attempt for attempt in self.failed_attempts[email]
-                if (now - attempt).total_seconds() < self.LOCKOUT_DURATION * 60
-            ]
-            
-            # Check if too many recent failed attempts
-            if len(self.failed_attempts[email]) >= self.MAX_LOGIN_ATTEMPTS:
-                lockout_end = now + timedelta(minutes=self.LOCKOUT_DURATION)
-                self.account_lockouts[email] = lockout_end
-                return True, lockout_end
+        result = self._verify_pw(password, password_hash)
+        with self._state_lock:
+            self._verify_cache[key] = (result, now, password_hash)
+            if len(self._verify_cache) > self.VERIFY_CACHE_SIZE:
+                self._verify_cache.popitem(last=False)
+        return result
+
+    def _verify_token(self, token: str) -> Optional[dict]:
+        """Verify a session token, reusing the payload of a recently verified token"""
+        now = time.time()
+        with self._state_lock:
+            entry = self._token_cache.get(token)
+            if entry is not None:
+                token_data, expires_at = entry
+                if now < expires_at:
+                    self._token_cache.move_to_end(token)
+                    return token_data
+                self._token_cache.pop(token, None)
         
-        return False, None
+        token_data = self.security_manager.verify_session_token(token)
+        if token_data:
+            expires_at = datetime.fromisoformat(token_data["expires_at"]).timestamp()
+            with self._state_lock:
+                self._token_cache[token] = (token_data, expires_at)
+                if len(self._token_cache) > self.TOKEN_CACHE_SIZE:
+                    self._token_cache.popitem(last=False)
+        return token_data
+
+    def _invalidate_token_cache(self, email: str) -> None:
+        """Forget cached tokens issued to email"""
+        with self._state_lock:
+            for token in [token for token, (data, _) in self._token_cache.items() if data["email"] == email]:
+                del self._token_cache[token]
+
+    def _verify_dummy_password(self, password: str) -> None:
+        """Spend one password verification on a random hash, discarding the result"""
+        self._verify_pw(password, self._dummy_hash)
+
+    def _invalidate_verify_cache(self, email: str) -> None:
+        """Forget cached verification outcomes for email"""
+        with self._state_lock:
+            for key in [key for key in self._verify_cache if key[0] == email]:
+                del self._verify_cache[key]
+
+    def _password_digest(self, password: str) -> bytes:
+        """Keyed digest of a password, only meaningful inside this process"""
+        return hmac.new(self._verify_key, password.encode(), "sha256").digest()
 
-    def _record_failed_attempt(self, email: str) -> None:
+    def _get_hit_count(self, email: str, now: float) -> int:
+        """Return the weighted failed-attempt count for email inside the lockout window"""
+        with self._state_lock:
+            hits, last_failure = self._hit_counts.get(email, (0, 0.0))
+        if now - last_failure > self.LOCKOUT_SECONDS:
+            return 0
+        return hits
+
+    def _get_popularity(self, password_digest: bytes, now: float) -> int:
+        """Return how often password_digest failed across all accounts inside the lockout window"""
+        with self._state_lock:
+            failures, last_failure = self._password_popularity.get(password_digest, (0, 0.0))
+        if now - last_failure > self.LOCKOUT_SECONDS:
+            return 0
+        return failures
+
+    def _record_popular_failure(self, email: str, password_digest: bytes, now: float) -> None:
+        """Weight a failed attempt by the password's popularity and count the guess"""
+        with self._state_lock:
+            popularity = self._get_popularity(password_digest, now)
+            hits = self._get_hit_count(email, now) + 1 + popularity
+            self._put_failure(self._hit_counts, email, (hits, now), now, self.LOCKOUT_SECONDS)
+            self._put_failure(self._password_popularity, password_digest, (popularity + 1, now),
+                              now, self.LOCKOUT_SECONDS)
+
+    def _put_failure(self, table: OrderedDict, key, value, now: float, window: float,
+                     stamp_index: Optional[int] = 1) -> None:
+        """
+        Store value as the newest entry of a failure table kept in last-failure order
+        (value[stamp_index] is the failure time, or value itself with stamp_index None).
+        Entries older than window are evicted, then the oldest while the table is over
+        POPULARITY_TABLE_SIZE, so a flood of new keys cannot wipe the recent ones.
+        """
+        table[key] = value
+        table.move_to_end(key)
+        cutoff = now - window
+        while table:
+            oldest_key, oldest = next(iter(table.items()))
+            stamp = oldest if stamp_index is None else oldest[stamp_index]
+            if stamp >= cutoff and len(table) <= self.POPULARITY_TABLE_SIZE:
+                break
+            del table[oldest_key]
+
+    @staticmethod
+    def _lockout_key(email: str) -> str:
+        """Normalized, interned email used for failed-attempt tracking"""
+        return sys.intern(email.casefold())
+
+    def _check_account_lockout(self, email: str, now: Optional[float] = None) -> Tuple[bool, Optional[float]]:
+        """Check if account is locked out"""
+        return self._attempt_store.check_locked(email, now)
+
+    def _record_failed_attempt(self, email: str, now: Optional[float] = None) -> None:
         """Record a failed login attempt"""
-        now = datetime.now(UTC)
-        if email not in self.failed_attempts:
-            self.failed_attempts[email] = []
-        self.failed_attempts[email].append(now)
+        self._attempt_store.record_failed(email, now)
+        if now is None:
+            now = time.monotonic()
+        with self._state_lock:
+            self._put_failure(self._last_failure, email, now, now, self.FAILED_LOGIN_MIN_INTERVAL, stamp_index=None)
 
     def authenticate_user(self, email: str, password: str) -> Optional[Tuple[str, dict]]:
         """Authenticate user and return session token if successful"""
-        # Check for account lockout
-        is_locked, lockout_end = self._check_account_lockout(email)
-        if is_locked and lockout_end:
-            remaining_minutes = int((lockout_end - datetime.now(UTC)).total_seconds() / 60)
-            self._log_user_event(
-                "LOGIN_FAILED",
-                f"Account locked for {email}. {remaining_minutes} minutes remaining",
-                "WARNING"
-            )
-            raise ValueError(f"Account is locked. Try again in {remaining_minutes} minutes.")
-        elif is_locked:
-            self._log_user_event("LOGIN_FAILED", f"Account locked for {email}", "WARNING")
-            raise ValueError("Account is locked. Please try again later.")
-
-        users_data = self._load_users()
-        
-        if email not in users_data["users"]:
-            self._record_failed_attempt(email)
-            self._log_user_event("LOGIN_FAILED", f"Invalid email: {email}", "WARNING")
+        checked = self._check_credentials(email, password)
+        if checked is None:
             return None
+        email, password_hash = checked
         
-        user_data = users_data["users"][email]
-        if not self.security_manager.verify_password(password, user_data["password_hash"].encode()):
-            self._record_failed_attempt(email)
-            self._log_user_event("LOGIN_FAILED", f"Invalid password for {email}", "WARNING")
+        # Move bcrypt or outdated Argon2 hashes to the current parameters while the
+        # plaintext is at hand; hashed before taking the write lock
+        new_hash = self._hash_pw(password) if self.security_manager.needs_rehash(password_hash) else None
+        user_data = self._record_login(email, password_hash, new_hash)
+        if user_data is None:
+            # Deleted between the password check and recording the login
+            self._log_user_event("LOGIN_FAILED", f"User {email} no longer exists", "WARNING")
             return None
         
-        # Successful login - clear failed attempts
-        if email in self.failed_attempts:
-            del self.failed_attempts[email]
-        
-        # Update last login
-        user_data["last_login"] = datetime.now(UTC).isoformat()
-        users_data["users"][email] = user_data
-        self._save_users(users_data)
-        
         # Create session token
         token, expiry = self.security_manager.create_session_token({
             "email": email,
@@ -210,27 +720,114 @@ class UserManager:
         
         return token, user_data
     
-    def _can_manage_role(self, admin_role: str, target_role: str) -> bool:
-        """Check if admin_role can manage users with target_role"""
-        admin_perms = FilePermissions.get_role_permissions(admin_role)
-        target_perms = FilePermissions.get_role_permissions(target_role)
+    def _check_credentials(self, email: str, password: str) -> Optional[Tuple[str, bytes]]:
+        """
+        Check a login attempt, returning the stored email and password hash if the password is right.
+        Only the user lookup takes the users lock; the slow hash verification runs without it.
+        """
+        # Failed attempts are tracked per case-insensitive email, so changing
+        # the case of an address does not reset its lockout counters
+        lock_key = self._lockout_key(email)
+        now = time.monotonic()  # one clock read shared by all lockout bookkeeping below
         
-        # Root can manage all roles except other roots
-        if admin_role == "root":
-            return not FilePermissions.has_permission(target_role, FileOperation.SCHEMA_MODIFY)
+        # Immediate retries after a failure fail like a wrong password before any
+        # file or hashing work is done, and still count toward the lockout
+        with self._state_lock:
+            last_failure = self._last_failure.get(lock_key)
+        if last_failure is not None and now - last_failure < self.FAILED_LOGIN_MIN_INTERVAL:
+            self._record_failed_attempt(lock_key, now)
+            self._log_user_event("LOGIN_THROTTLED", f"Retry too soon for {email}", "WARNING")
+            return None
         
-        # Admin can manage roles with fewer permissions
-        if admin_role == "admin":
-            return (not FilePermissions.has_permission(target_role, FileOperation.SCHEMA_MODIFY) and
-                   not FilePermissions.has_permission(target_role, FileOperation.DELETE))
+        # Check for account lockout
+        is_locked, remaining_seconds = self._check_account_lockout(lock_key, now)
+        if is_locked and remaining_seconds:
+            remaining_minutes = int(remaining_seconds / 60)
+            self._log_user_event(
+                "LOGIN_FAILED",
+                f"Account locked for {email}. {remaining_minutes} minutes remaining",
+                "WARNING"
+            )
+            raise ValueError(f"Account is locked. Try again in {remaining_minutes} minutes.")
+        elif is_locked:
+            self._log_user_event("LOGIN_FAILED", f"Account locked for {email}", "WARNING")
+            raise ValueError("Account is locked. Please try again later.")
         
-        return False
+        # Failures weighted by password popularity lock the account once they exceed the budget
+        if self._get_hit_count(lock_key, now) > self.POPULARITY_THRESHOLD:
+            self._log_user_event("LOGIN_FAILED", f"Account locked for {email} after popular password guesses", "WARNING")
+            raise ValueError("Account is locked. Please try again later.")
 
+        stored = self._stored_credentials(email)
+        if stored is None:
+            # Keep unknown emails indistinguishable from wrong passwords by timing
+            self._verify_dummy_password(password)
+            self._record_failed_attempt(lock_key, now)
+            self._log_user_event("LOGIN_FAILED", f"Invalid email: {email}", "WARNING")
+            return None
+        email, password_hash = stored
+        
+        password_digest = self._password_digest(password)
+        if not self._verify_password_cached(email, password, password_hash, password_digest):
+            self._record_failed_attempt(lock_key, now)
+            self._record_popular_failure(lock_key, password_digest, now)
+            self._log_user_event("LOGIN_FAILED", f"Invalid password for {email}", "WARNING")
+            return None
+        
+        # Successful login - clear failed attempts
+        self._attempt_store.clear(lock_key)
+        with self._state_lock:
+            self._hit_counts.pop(lock_key, None)
+            self._last_failure.pop(lock_key, None)
+        
+        return email, password_hash
+    
+    @_reads_users
+    def _stored_credentials(self, email: str) -> Optional[Tuple[str, bytes]]:
+        """Return the stored spelling of email and its password hash, or None for an unknown user"""
+        users_data = self._load_users()
+        stored_email = self._find_email(users_data, email)
+        if stored_email is None:
+            return None
+        return stored_email, users_data["users"][stored_email]["password_hash"]
+    
+    @_writes_users
+    def _record_login(self, email: str, checked_hash: bytes, new_hash: Optional[bytes]) -> Optional[dict]:
+        """
+        Store last_login (and an upgraded password hash) in the cache; written to disk by the deferred flush.
+        Returns the user in the get_user format, or None if the user no longer exists.
+        """
+        user_data = self._load_users()["users"].get(email)
+        if user_data is None:
+            return None
+        # Skip the upgrade if the password was changed since it was checked
+        rehashed = new_hash is not None and user_data["password_hash"] == checked_hash
+        if rehashed:
+            user_data["password_hash"] = new_hash
+        user_data["last_login"] = datetime.now(UTC).isoformat()
+        self._schedule_flush(email, user_data["last_login"], rehashed)
+        # Hand out a copy without the password hash; user_data itself is the shared cache
+        return self._user_entry(email, user_data, *self._role_capabilities(user_data["role"]))
+    
+    async def authenticate_user_async(self, email: str, password: str) -> Optional[Tuple[str, dict]]:
+        """
+        authenticate_user without blocking the event loop.
+        Runs on the loop's default executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.authenticate_user, email, password)
+    
     def create_user(self, admin_token: str, email: str, password: str, role: str = "user") -> bool:
         """Create new user (requires appropriate permissions)"""
+        # Hash before taking the write lock so logins never wait on it
+        return self._create_user(admin_token, email, self._hash_pw(password), role)
+    
+    @_writes_users
+    def _create_user(self, admin_token: str, email: str, password_hash: bytes, role: str) -> bool:
+        """create_user with the password already hashed"""
         # Verify token and permissions
-        token_data = self.security_manager.verify_session_token(admin_token)
-        if not token_data or not FilePermissions.has_permission(token_data["role"], FileOperation.USER_CREATE):
+        token_data = self._verify_token(admin_token)
+        if not token_data or not self._has_perm(token_data["role"], FileOperation.USER_CREATE):
             self._log_user_event(
                 "USER_CREATE_FAILED",
                 f"Insufficient permissions for {token_data['email'] if token_data else 'unknown'}",
@@ -252,7 +849,7 @@ class UserManager:
             return False
             
         # Check if admin can manage this role
-        if not FilePermissions.can_manage_role(token_role, role):
+        if not self._can_manage(token_role, role):
             self._log_user_event(
                 "USER_CREATE_FAILED",
                 f"Admin {admin_email} cannot create users with role {role}",
@@ -262,8 +859,8 @@ class UserManager:
         
         users_data = self._load_users()
         
-        # Check if user already exists
-        if email in users_data["users"]:
+        # Check if user already exists (in any letter case)
+        if self._find_email(users_data, email) is not None:
             self._log_user_event(
                 "USER_CREATE_FAILED",
                 f"User {email} already exists. Attempted by {admin_email}",
@@ -273,102 +870,246 @@ class UserManager:
         
         # Create new user
         users_data["users"][email] = {
-            "password_hash": self.security_manager.hash_password(password).decode(),
+            "password_hash": password_hash,
             "role": role,
             "created_at": datetime.now(UTC).isoformat(),
             "created_by": admin_email,
             "last_login": None,
             "is_root": role == "root"
         }
+        self._email_index[email.casefold()] = email
         
-        self._save_users(users_data)
+        self._journal_put(users_data, email)
         
         self._log_user_event(
             "USER_CREATED",
             f"New user {email} created with role {role} by {admin_email}"
         )
         return True
-    
+
+    def create_users_bulk(self, admin_token: str, users: List[Tuple[str, str, str]]) -> List[str]:
+        """
+        Create many users with a single load/save of the users file.
+        Returns the list of emails that were actually created.
+        """
+        token_data = self._verify_token(admin_token)
+        if not token_data or not self._has_perm(token_data["role"], FileOperation.USER_CREATE):
+            self._log_user_event(
+                "USER_CREATE_FAILED",
+                f"Insufficient permissions for {token_data['email'] if token_data else 'unknown'}",
+                "ERROR"
+            )
+            return []
+
+        # Validate every candidate before doing any expensive hashing
+        accepted = self._bulk_candidates(token_data, users)
+        if not accepted:
+            return []
+
+        # Hash in parallel, outside the users lock
+        hashes = list(_HASH_POOL.map(self._hash_pw, [password for _, password, _ in accepted]))
+        return self._insert_users(token_data["email"], accepted, hashes)
+
+    @_reads_users
+    def _bulk_candidates(self, token_data: dict, users: List[Tuple[str, str, str]]) -> List[Tuple[str, str, str]]:
+        """Return the (email, password, role) entries token_data may create"""
+        token_role = token_data["role"]
+        admin_email = token_data["email"]
+
+        users_data = self._load_users()
+
+        accepted = []
+        seen = set()
+        for email, password, role in users:
+            if role not in self.VALID_ROLES or not self._can_manage(token_role, role):
+                self._log_user_event(
+                    "USER_CREATE_FAILED",
+                    f"Admin {admin_email} cannot create user {email} with role {role}",
+                    "ERROR"
+                )
+                continue
+            if self._find_email(users_data, email) is not None or email.casefold() in seen:
+                self._log_user_event(
+                    "USER_CREATE_FAILED",
+                    f"User {email} already exists. Attempted by {admin_email}",
+                    "ERROR"
+                )
+                continue
+            seen.add(email.casefold())
+            accepted.append((email, password, role))
+        return accepted
+
+    @_writes_users
+    def _insert_users(self, admin_email: str, accepted: List[Tuple[str, str, str]],
+                      hashes: List[bytes]) -> List[str]:
+        """Store the validated users with their password hashes"""
+        users_data = self._load_users()
+
+        created = []
+        created_at = datetime.now(UTC).isoformat()
+        for (email, _, role), password_hash in zip(accepted, hashes):
+            # Another writer may have created the same email while the hashes were computed
+            if self._find_email(users_data, email) is not None:
+                self._log_user_event(
+                    "USER_CREATE_FAILED",
+                    f"User {email} already exists. Attempted by {admin_email}",
+                    "ERROR"
+                )
+                continue
+            users_data["users"][email] = {
+                "password_hash": password_hash,
+                "role": role,
+                "created_at": created_at,
+                "created_by": admin_email,
+                "last_login": None,
+                "is_root": role == "root"
+            }
+            self._email_index[email.casefold()] = email
+            created.append(email)
+
+        if not created:
+            return []
+        self._journal_put(users_data, *created)
+
+        self._log_user_event(
+            "USERS_CREATED",
+            f"{len(created)} users created in bulk by {admin_email}"
+        )
+        return created
+
     def change_password(self, token: str, old_password: str, new_password: str) -> bool:
         """Change user password"""
-        token_data = self.security_manager.verify_session_token(token)
+        token_data = self._verify_token(token)
         if not token_data:
             return False
         
+        # Verifying and hashing both run outside the users lock
         email = token_data["email"]
-        users_data = self._load_users()
-        
-        if email not in users_data["users"]:
+        old_hash = self._password_hash_of(email)
+        if old_hash is None or not self._verify_pw(old_password, old_hash):
             return False
         
-        user_data = users_data["users"][email]
-        if not self.security_manager.verify_password(old_password, user_data["password_hash"].encode()):
+        return self._replace_password(email, old_hash, self._hash_pw(new_password))
+    
+    @_reads_users
+    def _password_hash_of(self, email: str) -> Optional[bytes]:
+        """Return the stored password hash of email, or None for an unknown user"""
+        user_data = self._load_users()["users"].get(email)
+        return None if user_data is None else user_data["password_hash"]
+    
+    @_writes_users
+    def _replace_password(self, email: str, old_hash: bytes, new_hash: bytes) -> bool:
+        """Store new_hash for email unless the password changed since old_hash was checked"""
+        users_data = self._load_users()
+        user_data = users_data["users"].get(email)
+        if user_data is None or user_data["password_hash"] != old_hash:
             return False
         
         # Update password
-        user_data["password_hash"] = self.security_manager.hash_password(new_password).decode()
-        users_data["users"][email] = user_data
-        self._save_users(users_data)
+        user_data["password_hash"] = new_hash
+        self._journal_put(users_data, email)
+        self._invalidate_verify_cache(email)
+        self._invalidate_token_cache(email)
         
         return True
     
     def reset_password(self, admin_token: str, user_email: str, new_password: str) -> bool:
         """Reset user password (requires appropriate permissions)"""
-        token_data = self.security_manager.verify_session_token(admin_token)
-        if not token_data or not FilePermissions.has_permission(token_data["role"], FileOperation.PASSWORD_RESET):
+        # Hash before taking the write lock so logins never wait on it
+        return self._reset_password(admin_token, user_email, self._hash_pw(new_password))
+    
+    @_writes_users
+    def _reset_password(self, admin_token: str, user_email: str, password_hash: bytes) -> bool:
+        """reset_password with the new password already hashed"""
+        token_data = self._verify_token(admin_token)
+        if not token_data or not self._has_perm(token_data["role"], FileOperation.PASSWORD_RESET):
             return False
             
         token_role = token_data["role"]
         users_data = self._load_users()
         
+        user_email = self._find_email(users_data, user_email) or user_email
         if user_email not in users_data["users"]:
             return False
             
         target_user = users_data["users"][user_email]
         
         # Check if admin can manage this user's role
-        if not FilePermissions.can_manage_role(token_role, target_user["role"]):
+        if not self._can_manage(token_role, target_user["role"]):
             return False
         
         # Update password
-        target_user["password_hash"] = self.security_manager.hash_password(new_password).decode()
+        target_user["password_hash"] = password_hash
         target_user["password_reset_by"] = token_data["email"]
         target_user["password_reset_at"] = datetime.now(UTC).isoformat()
         
-        users_data["users"][user_email] = target_user
-        self._save_users(users_data)
+        self._journal_put(users_data, user_email)
+        self._invalidate_verify_cache(user_email)
+        self._invalidate_token_cache(user_email)
         
         return True
     
+    def _role_capabilities(self, role: str) -> Tuple[bool, frozenset]:
+        """Return (may delete users, roles it may manage) for role, computed once per role"""
+        capabilities = self._role_caps.get(role)
+        if capabilities is None:
+            capabilities = (
+                self._has_perm(role, FileOperation.USER_DELETE),
+                frozenset(FilePermissions.get_manageable_roles(role))
+            )
+            self._role_caps[role] = capabilities
+        return capabilities
+    
+    @_reads_users
     def get_users(self, admin_token: str) -> Optional[List[Dict]]:
         """Get list of users (requires view permission)"""
-        token_data = self.security_manager.verify_session_token(admin_token)
-        if not token_data or not FilePermissions.has_permission(token_data["role"], FileOperation.USER_VIEW):
+        token_data = self._verify_token(admin_token)
+        if not token_data or not self._has_perm(token_data["role"], FileOperation.USER_VIEW):
             return None
             
         users_data = self._load_users()
-        token_role = token_data["role"]
+        can_delete_any, manageable = self._role_capabilities(token_data["role"])
         
         return [
-            {
-                "email": email,
-                "role": data["role"],
-                "created_at": data["created_at"],
-                "last_login": data["last_login"],
-                "can_modify": FilePermissions.can_manage_role(token_role, data["role"]),
-                "can_delete": (FilePermissions.has_permission(token_role, FileOperation.USER_DELETE) and 
-                             FilePermissions.can_manage_role(token_role, data["role"]) and
-                             not data.get("is_root", False))
-            }
+            self._user_entry(email, data, can_delete_any, manageable)
             for email, data in users_data["users"].items()
         ]
     
+    @_reads_users
+    def get_user(self, admin_token: str, email: str) -> Optional[Dict]:
+        """Get one user in the get_users format (requires view permission)"""
+        token_data = self._verify_token(admin_token)
+        if not token_data or not self._has_perm(token_data["role"], FileOperation.USER_VIEW):
+            return None
+            
+        users_data = self._load_users()
+        stored_email = self._find_email(users_data, email)
+        if stored_email is None:
+            return None
+        can_delete_any, manageable = self._role_capabilities(token_data["role"])
+        return self._user_entry(stored_email, users_data["users"][stored_email], can_delete_any, manageable)
+    
+    @staticmethod
+    def _user_entry(email: str, data: dict, can_delete_any: bool, manageable: frozenset) -> Dict:
+        """Listing entry for one user, as returned by get_users"""
+        role, created_at, last_login = _USER_FIELDS(data)
+        can_modify = role in manageable
+        return {
+            "email": email,
+            "role": role,
+            "created_at": created_at,
+            "last_login": last_login,
+            "can_modify": can_modify,
+            "can_delete": can_delete_any and can_modify and not data.get("is_root", False)
+        }
+    
+    @_writes_users
     def delete_user(self, admin_token: str, user_email: str) -> bool:
         """Delete user (requires appropriate permissions)"""
         try:
             # Verify token and permissions
-            token_data = self.security_manager.verify_session_token(admin_token)
-            if not token_data or not FilePermissions.has_permission(token_data["role"], FileOperation.USER_DELETE):
+            token_data = self._verify_token(admin_token)
+            if not token_data or not self._has_perm(token_data["role"], FileOperation.USER_DELETE):
                 self._log_user_event(
                     "USER_DELETE_FAILED",
                     f"Insufficient permissions for {token_data['email'] if token_data else 'unknown'}",
@@ -382,6 +1123,7 @@ class UserManager:
             users_data = self._load_users()
             
             # Check if user exists
+            user_email = self._find_email(users_data, user_email) or user_email
             if user_email not in users_data["users"]:
                 self._log_user_event(
                     "USER_DELETE_FAILED",
@@ -394,7 +1136,7 @@ class UserManager:
             target_role = target_user["role"]
             
             # Check if admin can manage this user's role
-            if not FilePermissions.can_manage_role(token_role, target_role):
+            if not self._can_manage(token_role, target_role):
                 self._log_user_event(
                     "USER_DELETE_FAILED",
                     f"Admin {admin_email} cannot delete users with role {target_role}",
@@ -413,7 +1155,9 @@ class UserManager:
             
             # Delete user
             del users_data["users"][user_email]
-            self._save_users(users_data)
+            self._email_index.pop(user_email.casefold(), None)
+            self._journal_delete(user_email)
+            self._invalidate_token_cache(user_email)
             
             self._log_user_event(
                 "USER_DELETED",
@@ -429,10 +1173,11 @@ class UserManager:
             )
             return False
 
+    @_writes_users
     def change_user_role(self, admin_token: str, user_email: str, new_role: str) -> bool:
         """Change user role (requires appropriate permissions)"""
-        token_data = self.security_manager.verify_session_token(admin_token)
-        if not token_data or not FilePermissions.has_permission(token_data["role"], FileOperation.USER_MODIFY):
+        token_data = self._verify_token(admin_token)
+        if not token_data or not self._has_perm(token_data["role"], FileOperation.USER_MODIFY):
             self._log_user_event(
                 "ROLE_CHANGE_FAILED",
                 f"Insufficient permissions for {token_data['email'] if token_data else 'unknown'}",
@@ -453,6 +1198,7 @@ class UserManager:
             return False
             
         users_data = self._load_users()
+        user_email = self._find_email(users_data, user_email) or user_email
         if user_email not in users_data["users"]:
             self._log_user_event(
                 "ROLE_CHANGE_FAILED",
@@ -465,8 +1211,8 @@ class UserManager:
         current_role = target_user["role"]
         
         # Check if admin can manage both current and new roles
-        if not (FilePermissions.can_manage_role(token_role, current_role) and 
-                FilePermissions.can_manage_role(token_role, new_role)):
+        if not (self._can_manage(token_role, current_role) and 
+                self._can_manage(token_role, new_role)):
             self._log_user_event(
                 "ROLE_CHANGE_FAILED",
                 f"Admin {admin_email} cannot change role from {current_role} to {new_role}",
@@ -488,8 +1234,8 @@ class UserManager:
         target_user["modified_at"] = datetime.now(UTC).isoformat()
         target_user["modified_by"] = admin_email
         
-        users_data["users"][user_email] = target_user
-        self._save_users(users_data)
+        self._journal_put(users_data, user_email)
+        self._invalidate_token_cache(user_email)
         
         self._log_user_event(
             "ROLE_CHANGED",
@@ -499,7 +1245,7 @@ class UserManager:
 
     def get_manageable_roles(self, admin_token: str) -> List[str]:
         """Get list of roles that can be managed by the token holder"""
-        token_data = self.security_manager.verify_session_token(admin_token)
+        token_data = self._verify_token(admin_token)
         if not token_data:
             return []
         
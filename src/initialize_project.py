@@ -1,14 +1,20 @@
 #!/usr/bin/env python3
 import os
+import re
 import sys
 import shutil
 from getpass import getpass
 import json
 from pathlib import Path
 import stat
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, UTC
-from core.security_manager import SecurityManager
-from core.user_manager import UserManager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from core.security_manager import SecurityManager
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
 
 def log_step(message: str) -> None:
     """Print a step log message"""
@@ -26,73 +32,114 @@ def log_error(message: str) -> None:
     """Print an error log message"""
     print(f"[ERROR] {message}")
 
+def _force_writable(func, path, exc):
+    """shutil.rmtree error handler: make path and its parent writable and retry once on permission errors"""
+    if isinstance(exc, tuple):  # onerror passes sys.exc_info(), onexc the exception itself
+        exc = exc[1]
+    if not isinstance(exc, PermissionError):
+        raise exc
+    # On POSIX, removing an entry needs write permission on the directory holding it
+    parent = os.path.dirname(path)
+    if parent:
+        os.chmod(parent, stat.S_IWRITE | stat.S_IREAD | stat.S_IEXEC)
+    os.chmod(path, stat.S_IWRITE | stat.S_IREAD | stat.S_IEXEC)
+    func(path)
+
+# rmtree's onerror keyword is deprecated since Python 3.12 in favour of onexc
+_RMTREE_HANDLER = {'onexc' if sys.version_info >= (3, 12) else 'onerror': _force_writable}
+
+def _clear_directory_contents(directory):
+    """Remove what can be removed inside directory, returning (files_removed, dirs_removed)"""
+    # Count removals and report once; per-entry prints dominate on large trees
+    n_files = n_dirs = 0
+    if not hasattr(os, 'fwalk'):
+        # Windows has no fwalk; clear the top level and let rmtree handle subdirectories
+        for item in os.listdir(directory):
+            item_path = os.path.join(directory, item)
+            try:
+                try:
+                    os.unlink(item_path)
+                    n_files += 1
+                except (IsADirectoryError, PermissionError):
+                    if os.path.isdir(item_path):
+                        shutil.rmtree(item_path, ignore_errors=True)
+                        n_dirs += 1
+                    else:
+                        # Read-only file: clear the attribute only when it is actually in the way
+                        os.chmod(item_path, stat.S_IWRITE)
+                        os.unlink(item_path)
+                        n_files += 1
+            except FileNotFoundError:
+                pass
+            except Exception as sub_e:
+                log_warning(f"Could not remove {item_path}: {sub_e}")
+        return n_files, n_dirs
+    
+    # Bottom-up with an open fd per directory, so each removal resolves only the entry name
+    for root, dirs, files, rootfd in os.fwalk(directory, topdown=False):
+        for name in files:
+            try:
+                try:
+                    os.unlink(name, dir_fd=rootfd)
+                except PermissionError:
+                    # unlink needs write access to the parent, not the file; fix permissions only when refused
+                    os.chmod(rootfd, 0o700)
+                    os.chmod(name, 0o600, dir_fd=rootfd)
+                    os.unlink(name, dir_fd=rootfd)
+                n_files += 1
+            except FileNotFoundError:
+                pass
+            except Exception as sub_e:
+                log_warning(f"Could not remove {os.path.join(root, name)}: {sub_e}")
+        for name in dirs:
+            try:
+                try:
+                    os.rmdir(name, dir_fd=rootfd)
+                    n_dirs += 1
+                except NotADirectoryError:
+                    # Symlink to a directory: fwalk lists it under dirs but does not descend
+                    os.unlink(name, dir_fd=rootfd)
+                    n_files += 1
+            except FileNotFoundError:
+                pass
+            except Exception as sub_e:
+                log_warning(f"Could not remove {os.path.join(root, name)}: {sub_e}")
+    return n_files, n_dirs
+
 def ensure_directory(directory):
     """Create directory if it doesn't exist, clear it if it does"""
     try:
         log_info(f"Processing directory: {directory}")
         
-        # If directory exists, try to remove it safely
-        if os.path.exists(directory):
-            log_info(f"Removing existing directory: {directory}")
+        # An existing empty directory is already in the desired state
+        try:
+            with os.scandir(directory) as it:
+                if next(it, None) is None:
+                    log_info(f"Directory ready: {directory}")
+                    return True
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+        
+        # Remove any existing tree; a missing directory needs no existence probe
+        try:
+            shutil.rmtree(directory, **_RMTREE_HANDLER)
+            log_info(f"Removed existing directory: {directory}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log_warning(f"Could not fully remove directory {directory}: {e}")
+            # If we can't remove it, try to clean its contents
             try:
-                # First try to remove all files
-                for root, dirs, files in os.walk(directory, topdown=False):
-                    for name in files:
-                        try:
-                            file_path = os.path.join(root, name)
-                            if os.path.exists(file_path):
-                                os.chmod(file_path, 0o777)  # Give all permissions
-                                os.unlink(file_path)
-                                log_info(f"Removed file: {file_path}")
-                        except Exception as e:
-                            log_warning(f"Could not remove file {name}: {e}")
-                    
-                    # Then try to remove directories
-                    for name in dirs:
-                        try:
-                            dir_path = os.path.join(root, name)
-                            if os.path.exists(dir_path):
-                                os.chmod(dir_path, 0o777)  # Give all permissions
-                                os.rmdir(dir_path)
-                                log_info(f"Removed directory: {dir_path}")
-                        except Exception as e:
-                            log_warning(f"Could not remove directory {name}: {e}")
-                
-                # Finally remove the root directory
-                if os.path.exists(directory):
-                    os.chmod(directory, 0o777)  # Give all permissions
-                    os.rmdir(directory)
-                    log_info(f"Removed root directory: {directory}")
-            except Exception as e:
-                log_warning(f"Could not fully remove directory {directory}: {e}")
-                # If we can't remove it, try to clean its contents
-                try:
-                    for item in os.listdir(directory):
-                        item_path = os.path.join(directory, item)
-                        try:
-                            if os.path.isfile(item_path):
-                                os.chmod(item_path, 0o777)
-                                os.unlink(item_path)
-                                log_info(f"Removed file: {item_path}")
-                            elif os.path.isdir(item_path):
-                                shutil.rmtree(item_path, ignore_errors=True)
-                                log_info(f"Removed subdirectory: {item_path}")
-                        except Exception as sub_e:
-                            log_warning(f"Could not remove {item_path}: {sub_e}")
-                except Exception as clean_e:
-                    log_warning(f"Could not clean directory contents: {clean_e}")
+                n_files, n_dirs = _clear_directory_contents(directory)
+                log_info(f"Removed {n_files} files, {n_dirs} dirs from {directory}")
+            except Exception as clean_e:
+                log_warning(f"Could not clean directory contents: {clean_e}")
         
         # Create fresh directory
         log_info(f"Creating directory: {directory}")
-        os.makedirs(directory, exist_ok=True)
-        
-        # Verify directory exists
-        if os.path.exists(directory):
-            log_info(f"Directory ready: {directory}")
-            return True
-        else:
-            log_error(f"Failed to create directory: {directory}")
-            return False
+        os.makedirs(directory, exist_ok=True)  # raises on failure, so no existence check afterwards
+        log_info(f"Directory ready: {directory}")
+        return True
             
     except Exception as e:
         log_error(f"Error handling directory {directory}: {e}")
@@ -113,29 +160,16 @@ def clean_and_create_directory_structure():
         'resources/company'
     ]
     
-    # First ensure parent directories exist
-    for directory in directories:
-        parent = os.path.dirname(directory)
-        if parent and not os.path.exists(parent):
-            log_info(f"Creating parent directory: {parent}")
-            os.makedirs(parent, exist_ok=True)
-    
-    # Then process each directory
+    # ensure_directory's makedirs creates any missing parents along the way
     for directory in directories:
         if not ensure_directory(directory):
             raise Exception(f"Failed to prepare directory: {directory}")
         else:
-            # Double check directory is usable
-            try:
-                # Try to create a test file
-                test_file = os.path.join(directory, 'test.tmp')
-                with open(test_file, 'w') as f:
-                    f.write('test')
-                os.unlink(test_file)
-                log_info(f"Verified directory is writable: {directory}")
-            except Exception as e:
+            # Double check directory is usable; a single access() call instead of a test file
+            if not os.access(directory, os.W_OK):
                 log_error(f"Directory is not writable: {directory}")
-                raise Exception(f"Directory {directory} is not writable: {e}")
+                raise Exception(f"Directory {directory} is not writable")
+            log_info(f"Verified directory is writable: {directory}")
 
 def create_env_file(company_name: str, root_email: str, root_password: str, 
                    master_password: str, support_email: str, copyright_year: str) -> None:
@@ -163,8 +197,9 @@ DATABASE_FILE="data/database/database.enc"
 CONFIG_FILE="data/config/db_config.enc"
 """
         
-        with open(".env", "w") as f:
-            f.write(env_content.strip())
+        Path(".env").write_text(env_content.strip(), encoding="utf-8")
+        # Drop the reference so the plaintext credentials are not kept alive any longer
+        env_content = None
             
         log_info("Created .env file")
     except Exception as e:
@@ -185,37 +220,49 @@ def setup_resources():
         'resources/dummy-logo.ico': 'resources/company/icon.ico'
     }
     
+    tasks = []
     for src, dest in resource_files.items():
-        try:
-            if not os.path.exists(dest):
-                shutil.copy2(src, dest)
+        if os.path.exists(dest):
+            log_info(f"Resource already exists: {dest}")
+        else:
+            tasks.append((src, dest))
+    if not tasks:
+        return
+    
+    # The copies are I/O bound, so run them side by side
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        futures = {executor.submit(shutil.copyfile, src, dest): (src, dest) for src, dest in tasks}
+        for future in as_completed(futures):
+            src, dest = futures[future]
+            try:
+                future.result()
                 log_info(f"Copied resource: {src} -> {dest}")
-            else:
-                log_info(f"Resource already exists: {dest}")
-        except Exception as e:
-            log_warning(f"Could not copy resource {src}: {e}")
+            except Exception as e:
+                log_warning(f"Could not copy resource {src}: {e}")
 
 def validate_email(email: str) -> bool:
     """Basic email validation"""
-    import re
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return _EMAIL_RE.match(email) is not None
 
 def validate_password(password: str) -> bool:
     """Basic password validation"""
     if len(password) < 8:
         print("Password must be at least 8 characters long")
         return False
-    if not any(c.isupper() for c in password):
+    # One pass over the password: bit 1 = uppercase, 2 = lowercase, 4 = digit
+    mask = 0
+    for c in password:
+        mask |= c.isupper() | (c.islower() << 1) | (c.isdigit() << 2)
+        if mask == 7:
+            return True
+    if not mask & 1:
         print("Password must contain at least one uppercase letter")
         return False
-    if not any(c.islower() for c in password):
+    if not mask & 2:
         print("Password must contain at least one lowercase letter")
         return False
-    if not any(c.isdigit() for c in password):
-        print("Password must contain at least one number")
-        return False
-    return True
+    print("Password must contain at least one number")
+    return False
 
 def get_validated_input(prompt: str, validation_func=None, is_password: bool = False) -> str:
     """Get and validate user input"""
@@ -229,10 +276,43 @@ def get_validated_input(prompt: str, validation_func=None, is_password: bool = F
             return value
         print("Invalid input. Please try again.")
 
+def collect_init_config() -> dict:
+    """
+    Collect initialization settings before any files are touched.
+    Without a terminal (CI, automated deployment) they are read from environment variables.
+    """
+    if not sys.stdin.isatty():
+        log_info("No terminal detected, reading settings from environment variables")
+        names = ["COMPANY_NAME", "ROOT_EMAIL", "ROOT_PASSWORD", "MASTER_PASSWORD",
+                 "COPYRIGHT_YEAR", "SUPPORT_EMAIL"]
+        missing = [name for name in names if not os.environ.get(name)]
+        if missing:
+            raise Exception(f"Missing environment variables: {', '.join(missing)}")
+        config = {name.lower(): os.environ[name] for name in names}
+        for key in ("root_email", "support_email"):
+            if not validate_email(config[key]):
+                raise Exception(f"Invalid {key.upper()}: {config[key]}")
+        return config
+    
+    return {
+        "company_name": input("Enter company name: "),
+        "root_email": get_validated_input("Enter root email: ", validate_email),
+        "root_password": get_validated_input("Enter root password: ", is_password=True),
+        "master_password": get_validated_input(
+            "Enter master password for database encryption: ",
+            validation_func=lambda p: any(c.isupper() for c in p) or "Password must contain at least one uppercase letter",
+            is_password=True
+        ),
+        "copyright_year": input("Enter copyright year: "),
+        "support_email": get_validated_input("Enter support email: ", validate_email),
+    }
+
 def initialize_user_database(root_email: str, root_password: str, master_password: str) -> None:
     """Initialize user database with root account"""
     try:
         log_step("Initializing user database")
+        from core.security_manager import SecurityManager
+        from core.user_manager import UserManager
         
         # Create security manager
         security_manager = SecurityManager(salt_file="data/security/salt.key")
@@ -249,7 +329,7 @@ def initialize_user_database(root_email: str, root_password: str, master_passwor
         log_error(f"Failed to initialize user database: {str(e)}")
         raise
 
-def initialize_database_files(security_manager: SecurityManager, master_password: str) -> None:
+def initialize_database_files(security_manager: 'SecurityManager', master_password: str) -> None:
     """Initialize empty database files"""
     try:
         log_step("Initializing database files")
@@ -301,34 +381,20 @@ def main():
     try:
         # Get initialization information
         log_step("Collecting initialization information")
-        company_name = input("Enter company name: ")
-        root_email = get_validated_input("Enter root email: ", validate_email)
-        root_password = get_validated_input("Enter root password: ", is_password=True)
-        master_password = get_validated_input(
-            "Enter master password for database encryption: ",
-            validation_func=lambda p: any(c.isupper() for c in p) or "Password must contain at least one uppercase letter",
-            is_password=True
-        )
-        copyright_year = input("Enter copyright year: ")
-        support_email = get_validated_input("Enter support email: ", validate_email)
+        config = collect_init_config()
+        master_password = config["master_password"]
         
         # Create directory structure
         clean_and_create_directory_structure()
         
         # Create .env file
-        create_env_file(
-            company_name=company_name,
-            root_email=root_email,
-            root_password=root_password,
-            master_password=master_password,
-            support_email=support_email,
-            copyright_year=copyright_year
-        )
+        create_env_file(**config)
         
         # Initialize user database with root account
-        initialize_user_database(root_email, root_password, master_password)
+        initialize_user_database(config["root_email"], config["root_password"], master_password)
         
         # Initialize database files
+        from core.security_manager import SecurityManager
         security_manager = SecurityManager(salt_file="data/security/salt.key")
         initialize_database_files(security_manager, master_password)
         
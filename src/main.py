@@ -1,54 +1,49 @@
 import sys
 import os
-from PySide6.QtWidgets import QApplication, QMessageBox
-from PySide6.QtCore import QFile, QTextStream
-from dotenv import load_dotenv
+from collections import namedtuple
 from pathlib import Path
 from typing import Optional
 
-from core import SecurityManager, UserManager, DataManager
-from ui import LoginWindow, MainWindow
+# Environment variables required at startup, in Env field order
+REQUIRED_ENV_VARS = ('SALT_FILE', 'USERS_FILE', 'SCHEMA_FILE', 'DATABASE_FILE')
+Env = namedtuple('Env', 'salt users schema data')
 
-def get_env_var(var_name: str) -> str:
-    """Get environment variable with error handling"""
-    value = os.getenv(var_name)
-    if value is None:
-        print(f"Error: Required environment variable {var_name} not found!")
+def load_env() -> Env:
+    """Read all required environment variables, exiting on the first missing one"""
+    try:
+        return Env(*[os.environ[name] for name in REQUIRED_ENV_VARS])
+    except KeyError as e:
+        print(f"Error: Required environment variable {e.args[0]} not found!")
         print("Please check your .env file")
         sys.exit(1)
-    return value
 
 def load_styles(app):
     """Load application styles from QSS file"""
-    style_file = QFile("src/ui/styles.qss")
-    if style_file.open(QFile.ReadOnly | QFile.Text):
-        stream = QTextStream(style_file)
-        app.setStyleSheet(stream.readAll())
-        style_file.close()
+    try:
+        app.setStyleSheet((Path(__file__).parent / 'ui' / 'styles.qss').read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        pass
+
+# Entries that must exist after initialization, grouped by parent directory so
+# each parent is listed once: {parent: {name: must_be_directory}}
+REQUIRED_ENTRIES = {
+    '.': {'.env': False, 'data': True, 'logs': True, 'resources': True},
+    'resources/company': {'logo.png': False, 'icon.ico': False},
+}
 
 def check_initialization():
     """Check if the project has been initialized"""
-    required_files = [
-        '.env',
-        'resources/company/logo.png',
-        'resources/company/icon.ico'
-    ]
-    
-    required_dirs = [
-        'data',
-        'logs',
-        'resources/company'
-    ]
-    
-    # Check directories
-    for directory in required_dirs:
-        if not os.path.exists(directory):
-            return False
-            
-    # Check files
-    for file in required_files:
-        if not os.path.exists(file):
+    for parent, required in REQUIRED_ENTRIES.items():
+        try:
+            with os.scandir(parent) as entries:
+                found = {entry.name: entry for entry in entries if entry.name in required}
+        except (FileNotFoundError, NotADirectoryError):
             return False
+        
+        for name, must_be_dir in required.items():
+            entry = found.get(name)
+            if entry is None or (must_be_dir and not entry.is_dir()):
+                return False
             
     return True
 
@@ -59,6 +54,12 @@ def main():
         print("Please run 'python src/initialize_project.py' first")
         sys.exit(1)
     
+    # Heavy imports (Qt, cryptography) are deferred until the project is known to be initialized
+    from PySide6.QtWidgets import QApplication
+    from dotenv import load_dotenv
+    from core import SecurityManager, UserManager, DataManager
+    from ui import LoginWindow, MainWindow
+    
     # Load environment variables
     load_dotenv()
     
@@ -69,18 +70,15 @@ def main():
     load_styles(app)
     
     # Get required environment variables
-    salt_file = get_env_var('SALT_FILE')
-    users_file = get_env_var('USERS_FILE')
-    schema_file = get_env_var('SCHEMA_FILE')
-    data_file = get_env_var('DATABASE_FILE')
+    env = load_env()
     
     # Initialize managers
-    security_manager = SecurityManager(salt_file=salt_file)
-    user_manager = UserManager(security_manager, users_file=users_file)
+    security_manager = SecurityManager(salt_file=env.salt)
+    user_manager = UserManager(security_manager, users_file=env.users)
     data_manager = DataManager(
         security_manager,
-        schema_file=schema_file,
-        data_file=data_file
+        schema_file=env.schema,
+        data_file=env.data
     )
     
     # Create login window
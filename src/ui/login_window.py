@@ -1,15 +1,21 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QLabel, QLineEdit, QPushButton, QMessageBox)
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import Qt, Signal, QThreadPool
 from PySide6.QtGui import QIcon, QPixmap
 
+from .workers import Worker
+
 class LoginWindow(QMainWindow):
     # Signal emitted when login is successful
     login_successful = Signal(str, dict)
     
+    # Scaled logo shared by every instance; decoded on first use
+    _logo_cached = None
+    
     def __init__(self, user_manager):
         super().__init__()
         self.user_manager = user_manager
+        self._auth_in_flight = False
         self.init_ui()
         
     def init_ui(self):
@@ -27,8 +33,9 @@ class LoginWindow(QMainWindow):
         # Add Dummy logo
         logo_label = QLabel()
         logo_label.setObjectName('logoLabel')
-        logo_pixmap = QPixmap('resources/dummy-logo.png')
-        logo_label.setPixmap(logo_pixmap.scaledToWidth(180, Qt.SmoothTransformation))
+        if LoginWindow._logo_cached is None:
+            LoginWindow._logo_cached = QPixmap('resources/dummy-logo.png').scaledToWidth(180, Qt.SmoothTransformation)
+        logo_label.setPixmap(LoginWindow._logo_cached)
         logo_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(logo_label)
         
@@ -72,10 +79,10 @@ class LoginWindow(QMainWindow):
         form_layout.addWidget(self.error_label)
         
         # Login button
-        login_button = QPushButton('Login')
-        login_button.clicked.connect(self.handle_login)
-        login_button.setMinimumHeight(45)
-        form_layout.addWidget(login_button)
+        self.login_button = QPushButton('Login')
+        self.login_button.clicked.connect(self.handle_login)
+        self.login_button.setMinimumHeight(45)
+        form_layout.addWidget(self.login_button)
         
         # Add form container to main layout
         layout.addWidget(form_container)
@@ -98,8 +105,8 @@ class LoginWindow(QMainWindow):
         layout.addLayout(footer_layout)
         
         # Connect enter key to login
-        self.email_input.returnPressed.connect(login_button.click)
-        self.password_input.returnPressed.connect(login_button.click)
+        self.email_input.returnPressed.connect(self.login_button.click)
+        self.password_input.returnPressed.connect(self.login_button.click)
         
         # Set window icon
         self.setWindowIcon(QIcon('resources/dummy-logo.png'))
@@ -126,6 +133,10 @@ class LoginWindow(QMainWindow):
         
     def handle_login(self):
         """Handle login button click"""
+        # Ignore repeated submits (e.g. a held Enter key) while a login is being checked
+        if self._auth_in_flight:
+            return
+        
         email = self.email_input.text().strip()
         password = self.password_input.text()
         
@@ -134,8 +145,25 @@ class LoginWindow(QMainWindow):
             self.show_error('Please enter both email and password')
             return
         
-        # Attempt login
-        result = self.user_manager.authenticate_user(email, password)
+        # Attempt login off the GUI thread; the password hash check takes a noticeable moment
+        self._set_auth_in_flight(True)
+        worker = Worker(self.user_manager.authenticate_user, email, password)
+        worker.signals.done.connect(self._on_auth_done)
+        worker.signals.failed.connect(self._on_auth_failed)
+        self._auth_worker = worker  # keep the signals object alive until the result arrives
+        QThreadPool.globalInstance().start(worker)
+        
+    def _set_auth_in_flight(self, in_flight):
+        """Lock or unlock the form while a login is being checked"""
+        self._auth_in_flight = in_flight
+        self.login_button.setEnabled(not in_flight)
+        self.email_input.setEnabled(not in_flight)
+        self.password_input.setEnabled(not in_flight)
+        
+    def _on_auth_done(self, result):
+        """Handle the authenticate_user result"""
+        self._set_auth_in_flight(False)
+        self._auth_worker = None
         if result:
             token, user_data = result
             self.login_successful.emit(token, user_data)
@@ -144,6 +172,13 @@ class LoginWindow(QMainWindow):
             self.show_error('Invalid email or password')
             self.password_input.clear()
             
+    def _on_auth_failed(self, error):
+        """Handle an exception raised by authenticate_user (locked or throttled accounts raise ValueError)"""
+        self._set_auth_in_flight(False)
+        self._auth_worker = None
+        self.show_error(str(error) if isinstance(error, ValueError) else 'Login failed, please try again')
+        self.password_input.clear()
+        
     def keyPressEvent(self, event):
         """Handle key press events"""
         if event.key() == Qt.Key_Escape:
@@ -1,20 +1,34 @@
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                             QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+                             QLabel, QPushButton, QTableWidget, QTableWidgetItem, QTableView,
                              QFileDialog, QMessageBox, QMenuBar, QMenu, QStatusBar,
                              QDialog, QLineEdit, QComboBox, QSpinBox, QGroupBox,
-                             QHeaderView, QDateEdit)
-from PySide6.QtCore import Qt, Slot, Signal, QSize, QDate
+                             QHeaderView, QDateEdit, QAbstractItemView)
+from PySide6.QtCore import (Qt, Slot, Signal, QSize, QDate, QAbstractTableModel, QModelIndex,
+                            QObject, QThread, QThreadPool, QMetaObject, Q_ARG, QEvent, QTimer)
 from PySide6.QtGui import QAction, QIcon, QWindow, QColor
 import os
-import pandas as pd
+import hashlib
+import hmac
 from datetime import datetime
 import json
+from itertools import repeat
+
+from core.data_manager import RECORD_ID
+from .workers import Worker
 
 # Add Qt constants
 from PySide6.QtCore import Qt
 Qt.WA_TransparentForMouseEvents = Qt.WidgetAttribute.WA_TransparentForMouseEvents
 Qt.WindowStaysOnTopHint = Qt.WindowType.WindowStaysOnTopHint
 
+def _same_password(first, second):
+    """Compare two typed passwords in constant time"""
+    return hmac.compare_digest(first.encode("utf-8"), second.encode("utf-8"))
+
+# Roles allowed to edit records / to administer schema, configuration and users
+_EDITOR_ROLES = frozenset({'root', 'admin', 'moderator'})
+_ADMIN_ROLES = frozenset({'root', 'admin'})
+
 class SchemaDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -82,9 +96,312 @@ class SchemaDialog(QDialog):
                 })
         return schema
 
+class DatabaseConfigDialog(QDialog):
+    """Database location/password dialog; built once per main window and reused"""
+    
+    def __init__(self, data_manager, user_token, parent=None):
+        super().__init__(parent)
+        self.data_manager = data_manager
+        self.user_token = user_token
+        self.last_saved = None  # (directory, password digest) last saved from this dialog
+        self._save_worker = None  # keeps the running save alive until its result arrives
+        self._pending_key = None
+        self.setWindowTitle("Database Configuration")
+        self.setModal(True)
+        self.init_ui()
+        
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        
+        # Inline validation messages; created once and only re-texted/toggled afterwards
+        self.error_label = QLabel()
+        self.error_label.setObjectName("errorLabel")
+        self.error_label.hide()
+        layout.addWidget(self.error_label)
+        
+        # Directory selection
+        dir_group = QGroupBox("Database Location")
+        self.dir_group = dir_group
+        dir_layout = QHBoxLayout()
+        
+        self.dir_path = QLineEdit()
+        self.dir_path.setReadOnly(True)
+        dir_layout.addWidget(self.dir_path)
+        
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self.browse_directory)
+        dir_layout.addWidget(browse_button)
+        
+        dir_group.setLayout(dir_layout)
+        layout.addWidget(dir_group)
+        
+        # Password fields
+        pass_group = QGroupBox("Database Password")
+        self.pass_group = pass_group
+        pass_layout = QVBoxLayout()
+        
+        self.new_password = QLineEdit()
+        self.new_password.setPlaceholderText("New Database Password")
+        self.new_password.setEchoMode(QLineEdit.Password)
+        pass_layout.addWidget(self.new_password)
+        
+        self.confirm_password = QLineEdit()
+        self.confirm_password.setPlaceholderText("Confirm Database Password")
+        self.confirm_password.setEchoMode(QLineEdit.Password)
+        pass_layout.addWidget(self.confirm_password)
+        
+        pass_group.setLayout(pass_layout)
+        layout.addWidget(pass_group)
+        
+        # Buttons
+        button_layout = QHBoxLayout()
+        self.save_button = QPushButton("Save")
+        self.cancel_button = QPushButton("Cancel")
+        button_layout.addWidget(self.save_button)
+        button_layout.addWidget(self.cancel_button)
+        layout.addLayout(button_layout)
+        
+        # Check the passwords once typing settles rather than on every keystroke
+        self.validate_timer = QTimer(self)
+        self.validate_timer.setSingleShot(True)
+        self.validate_timer.setInterval(150)
+        self.validate_timer.timeout.connect(self.do_validate)
+        self.new_password.textChanged.connect(self._schedule_validate)
+        self.confirm_password.textChanged.connect(self._schedule_validate)
+        
+        self.save_button.clicked.connect(self.handle_save)
+        self.cancel_button.clicked.connect(self.reject)
+        
+    def reset_fields(self):
+        """Clear the inputs left over from the previous time the dialog was shown"""
+        self.dir_path.clear()
+        self.new_password.clear()
+        self.confirm_password.clear()
+        self.validate_timer.stop()  # clearing the fields queued a validation
+        self.error_label.hide()
+        self._set_inputs_enabled(self._save_worker is None)
+        
+    def _set_inputs_enabled(self, enabled):
+        self.dir_group.setEnabled(enabled)
+        self.pass_group.setEnabled(enabled)
+        self.save_button.setEnabled(enabled)
+        self.cancel_button.setEnabled(enabled)
+        
+    def reject(self):
+        # The database paths and password are being changed on another thread; stay open until it reports
+        if self._save_worker is None:
+            super().reject()
+            
+    def closeEvent(self, event):
+        if self._save_worker is not None:
+            event.ignore()
+            return
+        super().closeEvent(event)
+        
+    def browse_directory(self):
+        directory = QFileDialog.getExistingDirectory(self, "Select Database Directory")
+        if directory:
+            self.dir_path.setText(directory)
+            
+    def _schedule_validate(self, _text):
+        self.validate_timer.start()
+        
+    def do_validate(self):
+        confirm = self.confirm_password.text()
+        mismatch = bool(confirm) and not _same_password(self.new_password.text(), confirm)
+        if mismatch:
+            self.error_label.setText("Passwords do not match")
+        self.error_label.setVisible(mismatch)
+        if self._save_worker is None:
+            self.save_button.setEnabled(not mismatch)
+        
+    def handle_save(self):
+        if self._save_worker is not None:
+            return
+            
+        # Read each field once; the values feed validation, the change check and the worker
+        directory = self.dir_path.text()
+        password = self.new_password.text()
+        confirm = self.confirm_password.text()
+        
+        # Collect every problem and show them together inline instead of one modal per problem
+        errors = []
+        if not directory:
+            errors.append("Please select a database directory!")
+        if not _same_password(password, confirm):
+            errors.append("Passwords do not match!")
+        if not password:
+            errors.append("Please enter a database password!")
+        if errors:
+            self.error_label.setText("\n• ".join([""] + errors).lstrip("\n"))
+            self.error_label.show()
+            return
+        self.error_label.hide()
+        
+        # Saving the configuration last saved from this window again would only rewrite the files
+        config_key = (directory, hashlib.blake2b(password.encode("utf-8")).digest())
+        if config_key == self.last_saved:
+            QMessageBox.information(self, "No Changes", "The database configuration is already up to date")
+            self.accept()
+            return
+            
+        # Re-encrypting and moving the files is slow; do it on the thread pool
+        self._set_inputs_enabled(False)
+        worker = Worker(
+            self.data_manager.update_database_config,
+            self.user_token,
+            directory,
+            password
+        )
+        worker.signals.done.connect(self._on_saved)
+        worker.signals.failed.connect(self._on_save_failed)
+        self._save_worker = worker
+        self._pending_key = config_key
+        QThreadPool.globalInstance().start(worker)
+        
+    def _on_saved(self, result):
+        """Report the outcome of update_database_config"""
+        config_key = self._pending_key
+        self._save_worker = self._pending_key = None
+        self._set_inputs_enabled(True)
+        success, message = result
+        if success:
+            self.last_saved = config_key
+            QMessageBox.information(self, "Success", message)
+            self.accept()
+        else:
+            QMessageBox.warning(self, "Error", message)
+            
+    def _on_save_failed(self, error):
+        """Report an unexpected error raised while saving the database configuration"""
+        self._save_worker = self._pending_key = None
+        self._set_inputs_enabled(True)
+        QMessageBox.warning(self, "Error", f"Error updating database configuration: {error}")
+
+class PageModel(QAbstractTableModel):
+    """Read-only model over the current page of records"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._headers = ()
+        self._cells = []  # display strings, [row][column], aligned to _headers
+        
+    @staticmethod
+    def _stage(rows, headers):
+        """Build the page's display strings once, so painting is a plain list lookup per cell"""
+        return [
+            [value if isinstance(value, str) else str(value) for value in map(record.get, headers, repeat(""))]
+            for record in rows
+        ]
+        
+    def set_page(self, rows, headers):
+        """Replace the displayed page (rows are held by reference)"""
+        headers = tuple(headers)
+        cells = self._stage(rows, headers)
+        if headers and headers == self._headers:
+            # Same columns as the page on screen: reuse its rows, leave headers and column sizes alone.
+            # Only the tail that grows or shrinks is inserted/removed; the overlap is just repainted.
+            old_count, new_count = len(self._rows), len(rows)
+            if new_count < old_count:
+                self.beginRemoveRows(QModelIndex(), new_count, old_count - 1)
+                self._rows, self._cells = rows, cells
+                self.endRemoveRows()
+            elif new_count > old_count:
+                self.beginInsertRows(QModelIndex(), old_count, new_count - 1)
+                self._rows, self._cells = rows, cells
+                self.endInsertRows()
+            else:
+                self._rows, self._cells = rows, cells
+            overlap = min(old_count, new_count)
+            if overlap:
+                self.dataChanged.emit(
+                    self.index(0, 0), self.index(overlap - 1, len(headers) - 1), [Qt.DisplayRole]
+                )
+            return
+        
+        self.beginResetModel()
+        self._rows = rows
+        self._headers = headers
+        self._cells = cells
+        self.endResetModel()
+        
+    def record(self, row):
+        """Return the record dict shown in the given row"""
+        return self._rows[row]
+        
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+        
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+        
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        return self._cells[index.row()][index.column()]
+        
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+
+class _RoleLabelPositioner(QObject):
+    """Keeps the role label in the window's top-right corner, coalescing bursts of resize events"""
+    
+    def __init__(self, window, label):
+        super().__init__(window)
+        self._window = window
+        self._label = label
+        self._pending = False
+        
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Resize and not self._pending:
+            self._pending = True
+            QTimer.singleShot(16, self._apply)
+        return False
+        
+    def _apply(self):
+        self._pending = False
+        self._label.move(self._window.width() - self._label.width() - 10, 0)
+
+class PageLoader(QObject):
+    """Fetches pages from the data manager on a worker thread"""
+    finished = Signal(dict)
+    
+    def __init__(self, data_manager):
+        super().__init__()
+        self.data_manager = data_manager
+        
+    @Slot(int, int, object, object)
+    def run(self, page, page_size, after_key, before_key):
+        """Load one page and emit it through finished"""
+        try:
+            result = self.data_manager.get_data(page, page_size, after_key=after_key, before_key=before_key)
+        except Exception as e:
+            result = {"error": str(e)}
+        self.finished.emit(result)
+
 class MainWindow(QMainWindow):
     # Signal emitted when logout is requested
     logout_requested = Signal()
+    # Internal: asks the loader thread for (page, page_size, after_key, before_key)
+    _page_requested = Signal(int, int, object, object)
+    
+    # Users shown per page in the user management dialog
+    USER_PAGE_SIZE = 100
+    
+    # Role label colors and style template (purple for unknown roles)
+    _ROLE_COLORS = {
+        'root': '#0078d4',      # Mavi
+        'admin': '#28a745',     # Yeşil
+        'moderator': '#ffc107', # Sarı
+        'user': '#6f42c1'       # Mor
+    }
+    _ROLE_LABEL_QSS = (
+        "QLabel { color: %s; font-weight: bold; font-size: 14px; "
+        "padding: 5px 10px; background: none; border: none; }"
+    )
     
     def __init__(self, user_manager, data_manager, user_token, user_data):
         super().__init__()
@@ -113,12 +430,26 @@ class MainWindow(QMainWindow):
                 print("ERROR: Could not get user info from token")
         
         print(f"Initialized MainWindow with user_data: {self.user_data}")
+        self._role = self.user_data.get('role', '')
         
         self.current_page = 1
         self.page_size = 100
+        self._schema_cache = None  # column definitions; reset when the schema is updated
+        self._shown_page = 1  # page whose records are in the table model
+        self._total_pages = float('inf')  # unknown until the first page arrives
+        self._dirty = True  # set when the stored data changed since the last load
+        self._config_dialog = None  # built on first use, then reused
+        self._excel_worker = None  # running Excel import, if any
+        self._write_controls = []  # actions/buttons that change the stored data; disabled during an import
         
         self.init_ui()
     
+    def _schema(self):
+        """Return the column definitions, reading them from the data manager only once"""
+        if self._schema_cache is None:
+            self._schema_cache = self.data_manager.get_schema()
+        return self._schema_cache
+    
     def init_ui(self):
         """Initialize the UI"""
         self.setWindowTitle('Data Management System')
@@ -135,8 +466,10 @@ class MainWindow(QMainWindow):
         self.create_menu_bar()
         
         # Create table
-        self.table = QTableWidget()
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)  # Make table read-only for all users
+        self.table_model = PageModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.table_model)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)  # Make table read-only for all users
         
         # Create navigation buttons
         nav_layout = QHBoxLayout()
@@ -150,20 +483,23 @@ class MainWindow(QMainWindow):
         nav_layout.addWidget(self.next_button)
         
         # Add edit buttons if user is admin, root or moderator
-        if self.user_data['role'] in ['root', 'admin', 'moderator']:
+        if self._role in _EDITOR_ROLES:
             edit_layout = QHBoxLayout()
             
             add_button = QPushButton("Add Record")
             add_button.clicked.connect(self.show_add_record_dialog)
             edit_layout.addWidget(add_button)
+            self._write_controls.append(add_button)
             
             edit_button = QPushButton("Edit Record")
             edit_button.clicked.connect(self.show_edit_record_dialog)
             edit_layout.addWidget(edit_button)
+            self._write_controls.append(edit_button)
             
             delete_button = QPushButton("Delete Record")
             delete_button.clicked.connect(self.delete_selected_record)
             edit_layout.addWidget(delete_button)
+            self._write_controls.append(delete_button)
             
             layout.addLayout(edit_layout)
         
@@ -174,6 +510,21 @@ class MainWindow(QMainWindow):
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         
+        # Pages are fetched on a worker thread so navigation never blocks the window
+        self._loads_in_flight = 0
+        self._loader_thread = QThread(self)
+        self._page_loader = PageLoader(self.data_manager)
+        self._page_loader.moveToThread(self._loader_thread)
+        self._page_requested.connect(self._page_loader.run)
+        self._page_loader.finished.connect(self._on_page_loaded)
+        self._loader_thread.start()
+        
+        # Previous/Next only move current_page; a burst of clicks settles into one fetch
+        self._nav_timer = QTimer(self)
+        self._nav_timer.setSingleShot(True)
+        self._nav_timer.setInterval(50)
+        self._nav_timer.timeout.connect(self._load_navigated_page)
+        
         # Load initial data
         self.load_data()
     
@@ -185,21 +536,24 @@ class MainWindow(QMainWindow):
         file_menu = menubar.addMenu('File')
         
         # Excel upload (admin/root/moderator only)
-        if self.user_data['role'] in ['root', 'admin', 'moderator']:
+        if self._role in _EDITOR_ROLES:
             upload_action = QAction('Upload Excel', self)
             upload_action.triggered.connect(self.handle_excel_upload)
             file_menu.addAction(upload_action)
+            self._write_controls.append(upload_action)
         
         # Schema definition (admin/root only)
-        if self.user_data['role'] in ['root', 'admin']:
+        if self._role in _ADMIN_ROLES:
             schema_action = QAction('Define Schema', self)
             schema_action.triggered.connect(self.handle_schema_definition)
             file_menu.addAction(schema_action)
+            self._write_controls.append(schema_action)
             
             # Database configuration (admin/root only)
             db_config_action = QAction('Database Configuration', self)
             db_config_action.triggered.connect(self.show_database_config)
             file_menu.addAction(db_config_action)
+            self._write_controls.append(db_config_action)
         
         file_menu.addSeparator()
         
@@ -208,7 +562,7 @@ class MainWindow(QMainWindow):
         file_menu.addAction(exit_action)
         
         # Admin menu (only for admin/root users)
-        if self.user_data['role'] in ['root', 'admin']:
+        if self._role in _ADMIN_ROLES:
             admin_menu = menubar.addMenu('Admin')
             
             users_action = QAction('Manage Users', self)
@@ -226,44 +580,30 @@ class MainWindow(QMainWindow):
         logout_action.triggered.connect(self.handle_logout)
         account_menu.addAction(logout_action)
 
-        # Create role label directly on the main window
-        role_label = QLabel(f"• {self.user_data['role'].upper()}", self)
-        role_label.setObjectName("roleLabel")
-        
-        # Set color based on role
-        role_colors = {
-            'root': '#0078d4',      # Mavi
-            'admin': '#28a745',     # Yeşil
-            'moderator': '#ffc107', # Sarı
-            'user': '#6f42c1'       # Mor
-        }
-        
-        role_color = role_colors.get(self.user_data['role'].lower(), '#6f42c1')  # Default to purple if role not found
-        
-        role_label.setStyleSheet(f"""
-            QLabel {{
-                color: {role_color};
-                font-weight: bold;
-                font-size: 14px;
-                padding: 5px 10px;
-                background: none;
-                border: none;
-            }}
-        """)
+        # Place the role label directly on the main window
+        role_label = self._make_role_label(self, self._role)
         
         # Position the label in the top-right corner
-        menubar_height = menubar.height()
         role_label.move(self.width() - role_label.width() - 10, 0)
         
-        # Update label position when window is resized
-        self.resizeEvent = lambda event: role_label.move(
-            self.width() - role_label.width() - 10,
-            0
+        # Follow window resizes, at most once per frame, without replacing resizeEvent
+        self._role_label_positioner = _RoleLabelPositioner(self, role_label)
+        self.installEventFilter(self._role_label_positioner)
+    
+    @staticmethod
+    def _make_role_label(parent, role):
+        """Create the styled role label for role on parent"""
+        label = QLabel(f"• {role.upper()}", parent)
+        label.setObjectName("roleLabel")
+        # Set color based on role
+        label.setStyleSheet(
+            MainWindow._ROLE_LABEL_QSS % MainWindow._ROLE_COLORS.get(role.lower(), '#6f42c1')
         )
+        return label
     
     def show_add_record_dialog(self):
         """Show dialog to add a new record"""
-        if self.user_data['role'] not in ['root', 'admin', 'moderator']:
+        if self._role not in _EDITOR_ROLES:
             return
             
         dialog = QDialog(self)
@@ -273,7 +613,7 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(dialog)
         
         # Get schema for fields
-        schema = self.data_manager.get_schema()
+        schema = self._schema()
         fields = {}
         
         for col_def in schema:
@@ -298,6 +638,7 @@ class MainWindow(QMainWindow):
             if success:
                 QMessageBox.information(dialog, "Success", message)
                 dialog.accept()
+                self._dirty = True
                 self.load_data()
             else:
                 QMessageBox.warning(dialog, "Error", message)
@@ -309,10 +650,10 @@ class MainWindow(QMainWindow):
     
     def show_edit_record_dialog(self):
         """Show dialog to edit selected record"""
-        if self.user_data['role'] not in ['root', 'admin', 'moderator']:
+        if self._role not in _EDITOR_ROLES:
             return
             
-        current_row = self.table.currentRow()
+        current_row = self.table.currentIndex().row()
         if current_row < 0:
             QMessageBox.warning(self, "Error", "Please select a record to edit")
             return
@@ -324,15 +665,15 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(dialog)
         
         # Get schema and current data
-        schema = self.data_manager.get_schema()
+        schema = self._schema()
+        record = self.table_model.record(current_row)
         fields = {}
         
-        for col_idx, col_def in enumerate(schema):
+        for col_def in schema:
             field_layout = QHBoxLayout()
             label = QLabel(col_def["name"])
             field = QLineEdit()
-            current_value = self.table.item(current_row, col_idx).text()
-            field.setText(current_value)
+            field.setText(str(record.get(col_def["name"], "")))
             field_layout.addWidget(label)
             field_layout.addWidget(field)
             layout.addLayout(field_layout)
@@ -349,12 +690,13 @@ class MainWindow(QMainWindow):
             record_data = {name: field.text() for name, field in fields.items()}
             success, message = self.data_manager.update_record(
                 self.user_token,
-                (self.current_page - 1) * self.page_size + current_row,
+                record[RECORD_ID],
                 record_data
             )
             if success:
                 QMessageBox.information(dialog, "Success", message)
                 dialog.accept()
+                self._dirty = True
                 self.load_data()
             else:
                 QMessageBox.warning(dialog, "Error", message)
@@ -366,10 +708,10 @@ class MainWindow(QMainWindow):
     
     def delete_selected_record(self):
         """Delete selected record"""
-        if self.user_data['role'] not in ['root', 'admin', 'moderator']:
+        if self._role not in _EDITOR_ROLES:
             return
             
-        current_row = self.table.currentRow()
+        current_row = self.table.currentIndex().row()
         if current_row < 0:
             QMessageBox.warning(self, "Error", "Please select a record to delete")
             return
@@ -385,17 +727,18 @@ class MainWindow(QMainWindow):
         if reply == QMessageBox.Yes:
             success, message = self.data_manager.delete_record(
                 self.user_token,
-                (self.current_page - 1) * self.page_size + current_row
+                self.table_model.record(current_row)[RECORD_ID]
             )
             if success:
                 QMessageBox.information(self, "Success", message)
+                self._dirty = True
                 self.load_data()
             else:
                 QMessageBox.warning(self, "Error", message)
     
     def handle_excel_upload(self):
         """Handle Excel file upload"""
-        if self.user_data['role'] not in ['root', 'admin', 'moderator']:
+        if self._role not in _EDITOR_ROLES:
             return
             
         file_path, _ = QFileDialog.getOpenFileName(
@@ -406,22 +749,60 @@ class MainWindow(QMainWindow):
         )
         
         if file_path:
-            success, message = self.data_manager.process_excel(self.user_token, file_path)
-            if success:
-                QMessageBox.information(self, "Success", message)
-                self.load_data()
-            else:
-                QMessageBox.warning(self, "Error", message)
+            if self._excel_worker is not None:
+                QMessageBox.warning(self, "Import Running", "Please wait for the current Excel import to finish.")
+                return
+                
+            # Import on the thread pool; progress is posted to the status bar through the event loop
+            def report_progress(count):
+                QMetaObject.invokeMethod(
+                    self.status_bar, "showMessage", Qt.QueuedConnection,
+                    Q_ARG(str, f"Imported {count} rows...")
+                )
+            
+            worker = Worker(self.data_manager.process_excel, self.user_token, file_path, progress=report_progress)
+            worker.signals.done.connect(self._on_excel_processed)
+            worker.signals.failed.connect(self._on_excel_failed)
+            self._excel_worker = worker  # keep the signals object alive until the result arrives
+            # The import rewrites the data file when it finishes; hold back other writes until then
+            self._set_writes_enabled(False)
+            self.status_bar.showMessage("Importing Excel file...")
+            QThreadPool.globalInstance().start(worker)
+    
+    def _set_writes_enabled(self, enabled):
+        """Enable or disable every control that changes the stored data"""
+        for control in self._write_controls:
+            control.setEnabled(enabled)
+    
+    def _on_excel_processed(self, result):
+        """Report the outcome of an Excel import"""
+        self._excel_worker = None
+        self._set_writes_enabled(True)
+        success, message = result
+        if success:
+            QMessageBox.information(self, "Success", message)
+            self._dirty = True
+            self.load_data()
+        else:
+            self.status_bar.clearMessage()
+            QMessageBox.warning(self, "Error", message)
+    
+    def _on_excel_failed(self, error):
+        """Report an unexpected error raised during an Excel import"""
+        self._excel_worker = None
+        self._set_writes_enabled(True)
+        self.status_bar.clearMessage()
+        QMessageBox.warning(self, "Error", f"Error processing Excel file: {error}")
     
     def handle_schema_definition(self):
         """Handle schema definition"""
-        if self.user_data['role'] not in ['root', 'admin']:
+        if self._role not in _ADMIN_ROLES:
             return
             
         dialog = SchemaDialog(self)
         
         # Load existing schema
-        existing_schema = self.data_manager.get_schema()
+        existing_schema = self._schema()
         if existing_schema:
             for column in existing_schema:
                 dialog.table.insertRow(dialog.table.rowCount())
@@ -435,11 +816,13 @@ class MainWindow(QMainWindow):
             schema = dialog.get_schema()
             if schema:
                 if self.data_manager.update_schema(self.user_token, schema):
+                    self._schema_cache = None
                     QMessageBox.information(
                         self,
                         "Success",
                         "Schema updated successfully"
                     )
+                    self._dirty = True
                     self.load_data()
                 else:
                     QMessageBox.warning(
@@ -448,9 +831,88 @@ class MainWindow(QMainWindow):
                         "Failed to update schema"
                     )
     
+    def _populate_users(self, dialog, user_table, users):
+        """Fill the user management table with the given users"""
+        # Sorting is suspended so rows do not move while they are being filled
+        user_table.setSortingEnabled(False)
+        user_table.setRowCount(len(users))
+        for row, user in enumerate(users):
+            self._fill_user_row(dialog, user_table, row, user)
+        user_table.setSortingEnabled(True)
+    
+    def _fill_user_row(self, dialog, user_table, row, user):
+        """Fill one user management table row (items plus the role selector)"""
+        # Email
+        email_item = QTableWidgetItem(user["email"])
+        if not user.get("can_modify", False):
+            email_item.setForeground(QColor("#FF0000"))
+        user_table.setItem(row, 0, email_item)
+        
+        # Current Role (Account Type)
+        current_role_item = QTableWidgetItem(user["role"].upper())
+        if not user.get("can_modify", False):
+            current_role_item.setForeground(QColor("#FF0000"))
+        user_table.setItem(row, 1, current_role_item)
+        
+        # Role ComboBox (Change Account Type)
+        role_combo = QComboBox()
+        if self._role == 'root':
+            role_combo.addItems(["root", "admin", "moderator", "user"])
+        elif self._role == 'admin':
+            role_combo.addItems(["moderator", "user"])
+        
+        role_combo.setCurrentText(user["role"])
+        role_combo.setEnabled(user.get("can_modify", False))
+        
+        if not user.get("can_modify", False):
+            role_combo.setStyleSheet("""
+                QComboBox:disabled {
+                    color: #A0A0A0;
+                    background-color: #F0F0F0;
+                    border: 1px solid #D0D0D0;
+                }
+            """)
+        
+        def handle_role_change(email, new_role):
+            reply = QMessageBox.question(
+                dialog,
+                "Confirm Role Change",
+                f"Are you sure you want to change the role of {email} to {new_role}?",
+                QMessageBox.Yes | QMessageBox.No,
+                QMessageBox.No
+            )
+            
+            if reply == QMessageBox.Yes:
+                success = self.user_manager.change_user_role(self.user_token, email, new_role)
+                if success:
+                    QMessageBox.information(dialog, "Success", "Role updated successfully")
+                    dialog.accept()
+                    self.show_user_management()
+                else:
+                    QMessageBox.warning(dialog, "Error", "Failed to update role")
+                    role_combo.setCurrentText(user["role"])
+        
+        role_combo.currentTextChanged.connect(
+            lambda new_role, email=user["email"]: handle_role_change(email, new_role)
+        )
+        
+        user_table.setCellWidget(row, 2, role_combo)
+        
+        # Created date
+        created_item = QTableWidgetItem(user["created_at"])
+        if not user.get("can_modify", False):
+            created_item.setForeground(QColor("#FF0000"))
+        user_table.setItem(row, 3, created_item)
+        
+        # Last login
+        last_login_item = QTableWidgetItem(user["last_login"] or "Never")
+        if not user.get("can_modify", False):
+            last_login_item.setForeground(QColor("#FF0000"))
+        user_table.setItem(row, 4, last_login_item)
+    
     def show_user_management(self):
         """Show user management dialog (admin/root only)"""
-        if self.user_data['role'] not in ['root', 'admin']:
+        if self._role not in _ADMIN_ROLES:
             return
         
         dialog = QDialog(self)
@@ -512,114 +974,48 @@ class MainWindow(QMainWindow):
         ])
         user_table.setSortingEnabled(True)  # Enable sorting
         
-        # Load users first to calculate column widths
-        users = self.user_manager.get_users(self.user_token)
-        all_users = users.copy() if users else []  # Keep a copy of all users for filtering
+        # Filters run over every user; only the current page of the result is put in the table
+        self._user_page = 1
+        all_users = []  # Every user this account may view
+        filtered_users = []  # all_users matching the filters; paged into the table and exported
         
         def apply_filters():
-            if not all_users:
-                return
-                
-            filtered_users = all_users.copy()
+            filtered = all_users
             
             # Apply email filter
             if email_filter.text():
-                filtered_users = [
-                    user for user in filtered_users
+                filtered = [
+                    user for user in filtered
                     if email_filter.text().lower() in user["email"].lower()
                 ]
             
             # Apply role filter
             if role_filter.currentText() != "All Roles":
-                filtered_users = [
-                    user for user in filtered_users
+                filtered = [
+                    user for user in filtered
                     if user["role"] == role_filter.currentText()
                 ]
             
             # Apply date filter
             from_date = date_from.date().toPython()
             to_date = date_to.date().toPython()
-            filtered_users = [
-                user for user in filtered_users
+            filtered = [
+                user for user in filtered
                 if from_date <= datetime.fromisoformat(user["created_at"]).date() <= to_date
             ]
             
-            # Update table with filtered users
-            user_table.setRowCount(len(filtered_users))
-            for row, user in enumerate(filtered_users):
-                # Email
-                email_item = QTableWidgetItem(user["email"])
-                if not user.get("can_modify", False):
-                    email_item.setForeground(QColor("#FF0000"))
-                user_table.setItem(row, 0, email_item)
-                
-                # Current Role (Account Type)
-                current_role_item = QTableWidgetItem(user["role"].upper())
-                if not user.get("can_modify", False):
-                    current_role_item.setForeground(QColor("#FF0000"))
-                user_table.setItem(row, 1, current_role_item)
-                
-                # Role ComboBox (Change Account Type)
-                role_combo = QComboBox()
-                if self.user_data['role'] == 'root':
-                    role_combo.addItems(["root", "admin", "moderator", "user"])
-                elif self.user_data['role'] == 'admin':
-                    role_combo.addItems(["moderator", "user"])
-                
-                role_combo.setCurrentText(user["role"])
-                role_combo.setEnabled(user.get("can_modify", False))
-                
-                if not user.get("can_modify", False):
-                    role_combo.setStyleSheet("""
-                        QComboBox:disabled {
-                            color: #A0A0A0;
-                            background-color: #F0F0F0;
-                            border: 1px solid #D0D0D0;
-                        }
-                    """)
-                
-                def handle_role_change(email, new_role):
-                    reply = QMessageBox.question(
-                        dialog,
-                        "Confirm Role Change",
-                        f"Are you sure you want to change the role of {email} to {new_role}?",
-                        QMessageBox.Yes | QMessageBox.No,
-                        QMessageBox.No
-                    )
-                    
-                    if reply == QMessageBox.Yes:
-                        success = self.user_manager.change_user_role(self.user_token, email, new_role)
-                        if success:
-                            QMessageBox.information(dialog, "Success", "Role updated successfully")
-                            dialog.accept()
-                            self.show_user_management()
-                        else:
-                            QMessageBox.warning(dialog, "Error", "Failed to update role")
-                            role_combo.setCurrentText(user["role"])
-                
-                role_combo.currentTextChanged.connect(
-                    lambda new_role, email=user["email"]: handle_role_change(email, new_role)
-                )
-                
-                user_table.setCellWidget(row, 2, role_combo)
-                
-                # Created date
-                created_item = QTableWidgetItem(user["created_at"])
-                if not user.get("can_modify", False):
-                    created_item.setForeground(QColor("#FF0000"))
-                user_table.setItem(row, 3, created_item)
-                
-                # Last login
-                last_login_item = QTableWidgetItem(user["last_login"] or "Never")
-                if not user.get("can_modify", False):
-                    last_login_item.setForeground(QColor("#FF0000"))
-                user_table.setItem(row, 4, last_login_item)
+            filtered_users[:] = filtered
+            show_user_page()
+        
+        def filters_changed():
+            self._user_page = 1
+            apply_filters()
         
         # Connect filter signals
-        email_filter.textChanged.connect(apply_filters)
-        role_filter.currentTextChanged.connect(apply_filters)
-        date_from.dateChanged.connect(apply_filters)
-        date_to.dateChanged.connect(apply_filters)
+        email_filter.textChanged.connect(filters_changed)
+        role_filter.currentTextChanged.connect(filters_changed)
+        date_from.dateChanged.connect(filters_changed)
+        date_to.dateChanged.connect(filters_changed)
         
         def clear_all_filters():
             email_filter.clear()
@@ -629,7 +1025,38 @@ class MainWindow(QMainWindow):
         
         clear_filters.clicked.connect(clear_all_filters)
         
+        # User paging controls
+        user_nav = QHBoxLayout()
+        user_prev = QPushButton("Previous")
+        user_next = QPushButton("Next")
+        user_page_label = QLabel()
+        user_nav.addWidget(user_prev)
+        user_nav.addWidget(user_page_label)
+        user_nav.addWidget(user_next)
+        
+        def show_user_page():
+            page_count = max(1, -(-len(filtered_users) // self.USER_PAGE_SIZE))
+            self._user_page = min(self._user_page, page_count)
+            start = (self._user_page - 1) * self.USER_PAGE_SIZE
+            self._populate_users(dialog, user_table, filtered_users[start:start + self.USER_PAGE_SIZE])
+            user_page_label.setText(f"Page {self._user_page} of {page_count}")
+            user_prev.setEnabled(self._user_page > 1)
+            user_next.setEnabled(self._user_page < page_count)
+        
+        def previous_user_page():
+            if self._user_page > 1:
+                self._user_page -= 1
+                show_user_page()
+        
+        def next_user_page():
+            self._user_page += 1
+            show_user_page()
+        
+        user_prev.clicked.connect(previous_user_page)
+        user_next.clicked.connect(next_user_page)
+        
         # Initial population of table
+        all_users[:] = self.user_manager.get_users(self.user_token) or []
         apply_filters()
         
         # Set column resize modes and adjust widths after populating data
@@ -651,6 +1078,7 @@ class MainWindow(QMainWindow):
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         
         main_layout.addWidget(user_table)
+        main_layout.addLayout(user_nav)
         
         # Buttons
         buttons = QHBoxLayout()
@@ -702,7 +1130,7 @@ class MainWindow(QMainWindow):
             
             role = QComboBox()
             # Root can create any role except root, admin can only create moderator and user roles
-            if self.user_data['role'] == 'root':
+            if self._role == 'root':
                 role.addItems(["admin", "moderator", "user"])
             else:  # admin
                 role.addItems(["moderator", "user"])
@@ -728,9 +1156,11 @@ class MainWindow(QMainWindow):
                         "User created successfully"
                     )
                     add_dialog.accept()
-                    # Refresh user table
-                    dialog.accept()
-                    self.show_user_management()
+                    # Add the stored record to the filter source instead of rebuilding the dialog
+                    new_user = self.user_manager.get_user(self.user_token, email.text())
+                    if new_user is not None:
+                        all_users.append(new_user)
+                        apply_filters()
                 else:
                     QMessageBox.warning(
                         add_dialog,
@@ -802,7 +1232,7 @@ class MainWindow(QMainWindow):
                     return
                 
                 # Check role-based permissions - safely get role
-                current_user_role = self.user_data.get('role', '')
+                current_user_role = self._role
                 print(f"Current user role: {current_user_role}")
                 
                 if not current_user_role:
@@ -815,7 +1245,7 @@ class MainWindow(QMainWindow):
                     return
                 
                 if current_user_role == 'admin':
-                    if user_role in ['root', 'admin']:
+                    if user_role in _ADMIN_ROLES:
                         print("ERROR: Admin attempting to delete root/admin account")
                         QMessageBox.warning(
                             dialog,
@@ -859,20 +1289,16 @@ class MainWindow(QMainWindow):
                     print(f"Delete operation result: {success}")
                     
                     if success:
-                        # Remove the row from the table
+                        # Drop the user from the filter source and refill the current page; no dialog rebuild
                         print("Removing row from table...")
-                        user_table.removeRow(current_row)
+                        all_users[:] = [user for user in all_users if user["email"] != user_email]
+                        apply_filters()
                         
                         QMessageBox.information(
                             dialog,
                             "Success",
                             f"User {user_email} has been deleted successfully"
                         )
-                        
-                        # Refresh the user table to ensure consistency
-                        print("Refreshing user management view...")
-                        dialog.accept()
-                        self.show_user_management()
                     else:
                         print("ERROR: Delete operation failed")
                         error_msg = (
@@ -922,8 +1348,8 @@ class MainWindow(QMainWindow):
             user_role = user_table.item(current_row, 1).text()
             
             # Check permissions based on roles
-            if self.user_data['role'] == 'admin':
-                if user_role in ['root', 'admin']:
+            if self._role == 'admin':
+                if user_role in _ADMIN_ROLES:
                     QMessageBox.warning(dialog, "Error", "You don't have permission to reset this user's password")
                     return
             
@@ -952,7 +1378,7 @@ class MainWindow(QMainWindow):
             reset_layout.addLayout(reset_buttons)
             
             def handle_save():
-                if new_password.text() != confirm_password.text():
+                if not _same_password(new_password.text(), confirm_password.text()):
                     QMessageBox.warning(
                         reset_dialog,
                         "Error",
@@ -1030,20 +1456,20 @@ class MainWindow(QMainWindow):
             export_dialog.exec()
         
         def export_data(export_type, export_dialog):
-            """Export user table data to specified format"""
+            """Export the filtered users (every page) to specified format"""
             try:
-                # Get all data from the table
-                data = []
-                for row in range(user_table.rowCount()):
-                    row_data = {
-                        'Email': user_table.item(row, 0).text(),
-                        'Account Type': user_table.item(row, 1).text(),
-                        'Created': user_table.item(row, 3).text(),
-                        'Last Login': user_table.item(row, 4).text()
+                data = [
+                    {
+                        'Email': user["email"],
+                        'Account Type': user["role"].upper(),
+                        'Created': user["created_at"],
+                        'Last Login': user["last_login"] or "Never"
                     }
-                    data.append(row_data)
+                    for user in filtered_users
+                ]
                 
-                # Create DataFrame
+                # Create DataFrame (pandas is only needed here, so it is imported on first export)
+                import pandas as pd
                 df = pd.DataFrame(data)
                 
                 # Get file path from user
@@ -1089,33 +1515,57 @@ class MainWindow(QMainWindow):
         
         dialog.exec()
     
-    def load_data(self):
-        """Load data into the table"""
-        result = self.data_manager.get_data(self.current_page, self.page_size)
+    def load_data(self, after_key=None, before_key=None, force=False):
+        """
+        Request a page from the loader thread; the table is filled in _on_page_loaded.
+        Without keys the page is self.current_page by offset; previous/next pass the record id
+        bounding the current page so the store can seek straight to the neighbouring page.
+        Nothing is fetched unless the data is marked dirty or force is set (navigation).
+        """
+        if not (self._dirty or force):
+            return
+        self._dirty = False
+        
+        self._loads_in_flight += 1
+        self.prev_button.setEnabled(False)
+        self.next_button.setEnabled(False)
+        self._page_requested.emit(self.current_page, self.page_size, after_key, before_key)
+    
+    @Slot(dict)
+    def _on_page_loaded(self, result):
+        """Show a page delivered by the loader thread"""
+        self._loads_in_flight -= 1
+        if self._loads_in_flight:
+            return  # A newer request is queued; only its result is shown
+        
+        if "error" in result:
+            self.status_bar.showMessage(f"Failed to load data: {result['error']}")
+            self.prev_button.setEnabled(self.current_page > 1)
+            self.next_button.setEnabled(self.current_page < self._total_pages)
+            return
+        
         data = result["data"]
-        metadata = result["metadata"]
         pagination = result["pagination"]
+        self.current_page = self._shown_page = pagination["current_page"]
+        self._total_pages = pagination["total_pages"]
         
         if not data:
-            self.table.setRowCount(0)
-            self.table.setColumnCount(0)
+            self.table_model.set_page([], [])
             self.status_bar.showMessage("No data available")
+            self.prev_button.setEnabled(self.current_page > 1)
+            self.next_button.setEnabled(self.current_page < self._total_pages)
             return
         
         # Get schema for headers
-        schema = self.data_manager.get_schema()
-        headers = [col["name"] for col in schema]
-        
-        # Set up table
-        self.table.setRowCount(len(data))
-        self.table.setColumnCount(len(headers))
-        self.table.setHorizontalHeaderLabels(headers)
+        headers = [col["name"] for col in self._schema()]
         
-        # Fill data
-        for row, record in enumerate(data):
-            for col, header in enumerate(headers):
-                value = record.get(header, "")
-                self.table.setItem(row, col, QTableWidgetItem(str(value)))
+        # Hand the page to the model; the view asks only for the cells it paints.
+        # Updates are suspended so the reset and header change cause a single repaint.
+        self.table.setUpdatesEnabled(False)
+        try:
+            self.table_model.set_page(data, headers)
+        finally:
+            self.table.setUpdatesEnabled(True)
         
         # Update status bar
         self.status_bar.showMessage(
@@ -1126,16 +1576,43 @@ class MainWindow(QMainWindow):
         self.prev_button.setEnabled(pagination['current_page'] > 1)
         self.next_button.setEnabled(pagination['current_page'] < pagination['total_pages'])
     
+    def _page_key(self, row):
+        """Record id of a row on the current page, or None if the page is empty"""
+        if not self.table_model.rowCount():
+            return None
+        return self.table_model.record(row).get(RECORD_ID)
+    
+    def _load_navigated_page(self):
+        """Load the page the user navigated to once a burst of clicks has settled"""
+        step = self.current_page - self._shown_page
+        if step == 1:
+            self.load_data(after_key=self._page_key(self.table_model.rowCount() - 1), force=True)
+        elif step == -1:
+            self.load_data(before_key=self._page_key(0), force=True)
+        elif step:
+            # Jumped several pages: the on-screen keys do not help, go by offset
+            self.load_data(force=True)
+    
     def previous_page(self):
         """Go to previous page"""
         if self.current_page > 1:
             self.current_page -= 1
-            self.load_data()
+            self.prev_button.setEnabled(self.current_page > 1)
+            self._nav_timer.start()
     
     def next_page(self):
         """Go to next page"""
-        self.current_page += 1
-        self.load_data()
+        if self.current_page < self._total_pages:
+            self.current_page += 1
+            self.prev_button.setEnabled(True)
+            self.next_button.setEnabled(self.current_page < self._total_pages)
+            self._nav_timer.start()
+    
+    def closeEvent(self, event):
+        """Stop the page loader thread before the window goes away"""
+        self._loader_thread.quit()
+        self._loader_thread.wait()
+        super().closeEvent(event)
     
     def handle_logout(self):
         """Handle user logout"""
@@ -1175,7 +1652,7 @@ class MainWindow(QMainWindow):
         layout.addLayout(button_layout)
         
         def handle_save():
-            if new_password.text() != confirm_password.text():
+            if not _same_password(new_password.text(), confirm_password.text()):
                 QMessageBox.warning(dialog, "Error", "New passwords do not match!")
                 return
                 
@@ -1196,87 +1673,17 @@ class MainWindow(QMainWindow):
         
         dialog.exec()
     
+    def invalidate_config_cache(self):
+        """Forget the last saved database configuration (call when it is changed elsewhere)"""
+        if self._config_dialog is not None:
+            self._config_dialog.last_saved = None
+    
     def show_database_config(self):
         """Show dialog to configure database location and password"""
-        if self.user_data['role'] not in ['root', 'admin']:
+        if self._role not in _ADMIN_ROLES:
             return
             
-        dialog = QDialog(self)
-        dialog.setWindowTitle("Database Configuration")
-        dialog.setModal(True)
-        
-        layout = QVBoxLayout(dialog)
-        
-        # Directory selection
-        dir_group = QGroupBox("Database Location")
-        dir_layout = QHBoxLayout()
-        
-        dir_path = QLineEdit()
-        dir_path.setReadOnly(True)
-        dir_layout.addWidget(dir_path)
-        
-        browse_button = QPushButton("Browse...")
-        def browse_directory():
-            directory = QFileDialog.getExistingDirectory(dialog, "Select Database Directory")
-            if directory:
-                dir_path.setText(directory)
-        browse_button.clicked.connect(browse_directory)
-        dir_layout.addWidget(browse_button)
-        
-        dir_group.setLayout(dir_layout)
-        layout.addWidget(dir_group)
-        
-        # Password fields
-        pass_group = QGroupBox("Database Password")
-        pass_layout = QVBoxLayout()
-        
-        new_password = QLineEdit()
-        new_password.setPlaceholderText("New Database Password")
-        new_password.setEchoMode(QLineEdit.Password)
-        pass_layout.addWidget(new_password)
-        
-        confirm_password = QLineEdit()
-        confirm_password.setPlaceholderText("Confirm Database Password")
-        confirm_password.setEchoMode(QLineEdit.Password)
-        pass_layout.addWidget(confirm_password)
-        
-        pass_group.setLayout(pass_layout)
-        layout.addWidget(pass_group)
-        
-        # Buttons
-        button_layout = QHBoxLayout()
-        save_button = QPushButton("Save")
-        cancel_button = QPushButton("Cancel")
-        button_layout.addWidget(save_button)
-        button_layout.addWidget(cancel_button)
-        layout.addLayout(button_layout)
-        
-        def handle_save():
-            if not dir_path.text():
-                QMessageBox.warning(dialog, "Error", "Please select a database directory!")
-                return
-                
-            if new_password.text() != confirm_password.text():
-                QMessageBox.warning(dialog, "Error", "Passwords do not match!")
-                return
-                
-            if not new_password.text():
-                QMessageBox.warning(dialog, "Error", "Please enter a database password!")
-                return
-                
-            success, message = self.data_manager.update_database_config(
-                self.user_token,
-                dir_path.text(),
-                new_password.text()
-            )
-            
-            if success:
-                QMessageBox.information(dialog, "Success", message)
-                dialog.accept()
-            else:
-                QMessageBox.warning(dialog, "Error", message)
-        
-        save_button.clicked.connect(handle_save)
-        cancel_button.clicked.connect(dialog.reject)
-        
-        dialog.exec()
\ No newline at end of file
+        if self._config_dialog is None:
+            self._config_dialog = DatabaseConfigDialog(self.data_manager, self.user_token, self)
+        self._config_dialog.reset_fields()
+        self._config_dialog.exec()
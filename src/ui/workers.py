@@ -0,0 +1,25 @@
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+class WorkerSignals(QObject):
+    """Signals emitted by Worker; delivered on the receiver's (GUI) thread"""
+    done = Signal(object)
+    failed = Signal(object)
+
+class Worker(QRunnable):
+    """Runs a blocking callable on a QThreadPool thread and reports the outcome through signals"""
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+
+    def run(self):
+        """Call fn, then emit done(result) or failed(exception)"""
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(e)
+        else:
+            self.signals.done.emit(result)